@@ -0,0 +1,126 @@
+"""Fleet load test of the integration inside Home Assistant.
+
+Sets up N config entries through the integration's `async_setup_entry`, each
+connected to an in-memory loopback controller, and lets every controller push
+`color_event`s at a fixed rate. Reports the events handled per second, the
+state writes per second, the event loop lag and the CPU usage.
+
+    python benchmarks/fleet.py [controllers] [--rate N] [--duration S] [--max-lag MS]
+
+A controller running an animation pushes a color event every
+`color_interval_ms` (500 ms by default), so `--rate 2` models all lights
+animating. With `--max-lag` the script exits with status 1 if the 99th
+percentile of the event loop lag exceeds the given milliseconds. Requires
+Home Assistant to be installed.
+"""
+
+import argparse
+import asyncio
+import copy
+import logging
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from harness import add_entries, connect_to, loopback_devices, start_hass
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, callback
+
+from custom_components.fhem_rgbwwcontroller.core import rgbww_controller
+from custom_components.fhem_rgbwwcontroller.core.transport import LoopbackTransport
+
+_LAG_INTERVAL = 0.05
+
+
+async def _push_colors(device: LoopbackTransport, rate: float) -> None:
+    color = copy.deepcopy(device.state["color"])
+    await asyncio.sleep(random.random() / rate)  # spread the fleet over time
+    while True:
+        color["hsv"]["h"] = (color["hsv"]["h"] + 7) % 360
+        device.emit("color_event", color)
+        await asyncio.sleep(1 / rate)
+
+
+async def _sample_loop_lag(samples: list[float]) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(_LAG_INTERVAL)
+        samples.append(loop.time() - start - _LAG_INTERVAL)
+
+
+def _color_events(controllers: list[rgbww_controller.RgbwwController]) -> int:
+    return sum(c.metrics.events["color_event"] for c in controllers)
+
+
+async def _run(args: argparse.Namespace) -> int:
+    devices = loopback_devices(args.controllers)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await start_hass(config_dir)
+
+        with connect_to(devices):
+            started = time.perf_counter()
+            controllers = await add_entries(hass, list(devices))
+            async with asyncio.timeout(60):
+                while not all(c.state_completed for c in controllers):
+                    await asyncio.sleep(0.05)
+            await hass.async_block_till_done()
+            setup = time.perf_counter() - started
+
+        state_writes = 0
+
+        @callback
+        def on_state_changed(event: Event) -> None:
+            nonlocal state_writes
+            state_writes += 1
+
+        hass.bus.async_listen(EVENT_STATE_CHANGED, on_state_changed)
+
+        lag: list[float] = []
+        tasks = [
+            hass.async_create_background_task(_push_colors(d, args.rate), "push")
+            for d in devices.values()
+        ]
+        tasks.append(hass.async_create_background_task(_sample_loop_lag(lag), "lag"))
+
+        events_before = _color_events(controllers)
+        cpu_before = time.process_time()
+        started = time.perf_counter()
+        await asyncio.sleep(args.duration)
+        elapsed = time.perf_counter() - started
+        cpu = time.process_time() - cpu_before
+        events = _color_events(controllers) - events_before
+        writes = state_writes
+
+        for task in tasks:
+            task.cancel()
+        await hass.async_stop(force=True)
+
+    lag.sort()
+    lag_p99 = lag[int(len(lag) * 0.99)] if lag else 0.0
+    print(f"{args.controllers} controllers, {args.rate} color events/s each")
+    print(f"  setup:             {setup:10.2f} s")
+    print(f"  offered:           {args.controllers * args.rate:10.0f} events/s")
+    print(f"  handled:           {events / elapsed:10.0f} events/s")
+    print(f"  state writes:      {writes / elapsed:10.0f} /s")
+    print(f"  loop lag mean:     {statistics.fmean(lag or [0]) * 1000:10.2f} ms")
+    print(f"  loop lag p99:      {lag_p99 * 1000:10.2f} ms")
+    print(f"  loop lag max:      {max(lag or [0]) * 1000:10.2f} ms")
+    print(f"  CPU:               {cpu / elapsed * 100:10.1f} %")
+    if args.max_lag is not None and lag_p99 * 1000 > args.max_lag:
+        print(f"  loop lag exceeds the limit of {args.max_lag} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("controllers", type=int, nargs="?", default=100)
+    parser.add_argument("--rate", type=float, default=2.0)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--max-lag", type=float)
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(asyncio.run(_run(parser.parse_args())))
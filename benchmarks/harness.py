@@ -0,0 +1,84 @@
+"""Home Assistant harness shared by the benchmarks that set up config entries.
+
+The entries are set up through the integration's `async_setup_entry`, their
+controllers either do not connect at all or connect to in-memory loopback
+devices instead of the network.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+import sys
+from types import MappingProxyType
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant import bootstrap, config_entries, loader  # noqa: E402
+from homeassistant.const import CONF_HOST, CONF_NAME  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.fhem_rgbwwcontroller.const import DOMAIN  # noqa: E402
+from custom_components.fhem_rgbwwcontroller.core import (  # noqa: E402
+    rgbww_controller,
+)
+from custom_components.fhem_rgbwwcontroller.core.transport import (  # noqa: E402
+    LoopbackTransport,
+)
+
+
+def loopback_devices(count: int) -> dict[str, LoopbackTransport]:
+    """One loopback device per host."""
+    return {f"10.0.{i // 256}.{i % 256}": LoopbackTransport() for i in range(count)}
+
+
+@contextmanager
+def connect_to(devices: dict[str, LoopbackTransport]) -> Iterator[None]:
+    """Connect the controllers created meanwhile to the device of their host."""
+    with patch.object(
+        rgbww_controller, "NetworkTransport", lambda hass, host: devices[host]
+    ):
+        yield
+
+
+@contextmanager
+def without_connections() -> Iterator[None]:
+    """Keep the controllers created meanwhile from connecting to their host."""
+
+    async def connect(self: rgbww_controller.RgbwwController) -> None:
+        pass
+
+    with patch.object(rgbww_controller.RgbwwController, "connect", connect):
+        yield
+
+
+async def start_hass(config_dir: str) -> HomeAssistant:
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await bootstrap.async_load_base_functionality(hass)
+    return hass
+
+
+async def add_entries(
+    hass: HomeAssistant, hosts: list[str]
+) -> list[rgbww_controller.RgbwwController]:
+    """Add and set up one config entry per host."""
+    controllers = []
+    for i, host in enumerate(hosts):
+        entry = config_entries.ConfigEntry(
+            data={CONF_HOST: host, CONF_NAME: f"Controller {i}"},
+            discovery_keys=MappingProxyType({}),
+            domain=DOMAIN,
+            minor_version=1,
+            options={},
+            source=config_entries.SOURCE_USER,
+            subentries_data=None,
+            title=f"Controller {i}",
+            unique_id=f"a020a6{i:06x}",
+            version=1,
+        )
+        await hass.config_entries.async_add(entry)
+        controllers.append(entry.runtime_data)
+    return controllers
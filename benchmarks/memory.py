@@ -0,0 +1,210 @@
+"""Memory benchmark of the controller state.
+
+Connects N controllers to in-memory loopback devices that report a full
+firmware `info` and `config`, streams events to them until the histories are
+filled and reports the memory retained per controller (measured with
+tracemalloc).
+
+    python benchmarks/memory.py [controllers] [--max-bytes N] [--top N]
+
+With `--max-bytes` the script exits with status 1 if a controller needs more
+than N bytes. `tests/test_memory.py` runs the same measurement against
+`MAX_BYTES_PER_CONTROLLER`. Requires Home Assistant to be installed.
+"""
+
+import argparse
+import asyncio
+import gc
+from pathlib import Path
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.fhem_rgbwwcontroller.core.rgbww_controller import (  # noqa: E402
+    RgbwwController,
+)
+from custom_components.fhem_rgbwwcontroller.core.transport import (  # noqa: E402
+    LoopbackTransport,
+)
+
+# documented limit of the memory retained per controller, see docs/dev.md
+MAX_BYTES_PER_CONTROLLER = 65536
+
+# what a controller with firmware 0.8 reports, passwords and names replaced
+_DEVICE_STATE = {
+    "info": {
+        "deviceid": 2368834,
+        "current_rom": 0,
+        "git_version": "v0.8.1-0-g1f2e3d4",
+        "git_date": "2025-03-02",
+        "webapp_version": "0.3.3",
+        "sming": "4.7.0",
+        "event_num_clients": 1,
+        "uptime": 123456,
+        "heap_free": 21123,
+        "soc": "Esp8266",
+        "rgbww": {"version": "0.8.1", "queuesize": 100},
+        "connection": {
+            "connected": True,
+            "ssid": "network",
+            "dhcp": True,
+            "ip": "192.168.1.50",
+            "netmask": "255.255.255.0",
+            "gateway": "192.168.1.1",
+            "mac": "a020a60836aa",
+        },
+    },
+    "config": {
+        "network": {
+            "connection": {
+                "dhcp": True,
+                "ip": "192.168.1.50",
+                "netmask": "255.255.255.0",
+                "gateway": "192.168.1.1",
+                "mdnshostname": "rgbww-living-room",
+            },
+            "ap": {"secured": True, "password": "secret", "ssid": "RGBWW-836aa"},
+            "mqtt": {
+                "enabled": True,
+                "server": "mqtthost",
+                "port": 1883,
+                "username": "",
+                "password": "",
+                "topic_base": "home/",
+            },
+        },
+        "color": {
+            "outputmode": 0,
+            "startup_color": "last",
+            "hsv": {
+                "model": 0,
+                "red": 0,
+                "yellow": 0,
+                "green": 0,
+                "cyan": 0,
+                "blue": 0,
+                "magenta": 0,
+            },
+            "brightness": {
+                "red": 100,
+                "green": 100,
+                "blue": 100,
+                "ww": 100,
+                "cw": 100,
+            },
+            "colortemp": {"ww": 2700, "cw": 6000},
+        },
+        "ota": {"url": "http://rgbww.dronezone.de/release/version.json"},
+        "sync": {
+            "clock_master_enabled": False,
+            "clock_master_interval": 30,
+            "clock_slave_enabled": True,
+            "clock_slave_topic": "home/clock",
+            "cmd_master_enabled": False,
+            "cmd_master_topic": "home/commands",
+            "cmd_slave_enabled": True,
+            "cmd_slave_topic": "home/commands",
+            "color_master_enabled": False,
+            "color_master_interval_ms": 0,
+            "color_slave_enabled": False,
+            "color_slave_topic": "home/color",
+        },
+        "events": {
+            "color_interval_ms": 500,
+            "color_mininterval_ms": 500,
+            "transfin_interval_ms": 1000,
+            "server_enabled": True,
+        },
+        "general": {
+            "device_name": "Living Room",
+            "pin_config": "13,12,14,5,4",
+            "buttons_config": "",
+            "buttons_debounce_ms": 50,
+            "api_secured": False,
+            "api_password": "",
+        },
+    },
+    "color": {
+        "hsv": {"h": 54, "s": 50, "v": 50, "ct": 3000},
+        "raw": {"r": 500, "g": 500, "b": 500, "cw": 500, "ww": 500},
+        "mode": "hsv",
+    },
+}
+
+
+async def _settle(condition, timeout: float = 60) -> None:
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+async def measure_per_controller(
+    hass: HomeAssistant, count: int, events: int = 60, top: int = 0
+) -> float:
+    """Bytes retained per controller after `events` rounds of events."""
+    devices = [LoopbackTransport(_DEVICE_STATE) for _ in range(count)]
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    before = tracemalloc.get_traced_memory()[0]
+
+    controllers = [
+        RgbwwController(hass, f"10.0.{i // 256}.{i % 256}", transport=device)
+        for i, device in enumerate(devices)
+    ]
+    for controller in controllers:
+        await controller.connect()
+    await _settle(lambda: all(c.state_completed for c in controllers))
+
+    # steady state: the first messages are pushed out of the message history
+    for i in range(events):
+        for device in devices:
+            device.emit("keep_alive", {})
+            status = {"offset": i % 20 - 10, "current_interval": 20000}
+            device.emit("clock_slave_status", status)
+            device.emit("color_event", _DEVICE_STATE["color"])
+    await _settle(
+        lambda: all(c.metrics.events["keep_alive"] >= events for c in controllers)
+    )
+
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    if top:
+        stats = tracemalloc.take_snapshot().compare_to(baseline, "lineno")
+        for stat in stats[:top]:
+            print(f"  {stat}")
+    tracemalloc.stop()
+
+    for controller in controllers:
+        await controller.disconnect()
+    await asyncio.gather(*(c._connection_task for c in controllers))
+    return used / count
+
+
+async def _run(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        per_controller = await measure_per_controller(
+            hass, args.controllers, args.events, args.top
+        )
+        await hass.async_stop(force=True)
+
+    print(f"{args.controllers} controllers")
+    print(f"  retained per controller: {per_controller:10.0f} bytes")
+    if args.max_bytes is not None and per_controller > args.max_bytes:
+        print(f"  exceeds the limit of {args.max_bytes} bytes")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("controllers", type=int, nargs="?", default=200)
+    parser.add_argument("--events", type=int, default=60)
+    parser.add_argument("--max-bytes", type=int)
+    parser.add_argument("--top", type=int, default=0)
+    sys.exit(asyncio.run(_run(parser.parse_args())))
@@ -0,0 +1,112 @@
+"""Startup benchmark of the service registration.
+
+Sets up N config entries through the integration's `async_setup_entry` and
+compares the time until all entries are set up (the controllers do not
+connect, that runs in the background anyway):
+
+* per entry: the light platform registers the entity services again for
+  every config entry with `platform.async_register_entity_service` (as it
+  used to do), no domain services,
+* once: the current code, the services are registered once in
+  `async_setup`.
+
+    python benchmarks/startup.py [entries]
+
+Requires Home Assistant to be installed.
+"""
+
+import argparse
+import asyncio
+from contextlib import ExitStack
+import logging
+import sys
+import tempfile
+import time
+from typing import Any
+from unittest.mock import patch
+
+from harness import add_entries, start_hass, without_connections
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.helpers import entity_platform
+
+import custom_components.fhem_rgbwwcontroller as integration
+from custom_components.fhem_rgbwwcontroller import light, services
+from custom_components.fhem_rgbwwcontroller.const import CONTROLLER_INDEX, DOMAIN
+
+# the entity services the light platform registered for every config entry
+_ENTITY_SERVICES = {
+    services.SERVICE_CONTROL_CHANNEL: services._get_control_channel_service_schema,
+    services.SERVICE_ANIMATION_HSV: services._get_animation_hsv_service_schema,
+    services.SERVICE_ANIMATION_CLI_HSV: services._get_animation_cli_service_schema,
+    services.SERVICE_ANIMATION_RGBWW: services._get_animation_rgbww_service_schema,
+    services.SERVICE_ANIMATION_CLI_RGBWW: services._get_animation_cli_service_schema,
+}
+
+
+async def _noop_entity_service(entity: Any, call: ServiceCall) -> None:
+    pass
+
+
+def _without_domain_services(hass: HomeAssistant) -> None:
+    # the light entities still keep the index up to date
+    hass.data[DOMAIN].setdefault(CONTROLLER_INDEX, {})
+
+
+def _with_entity_services(async_setup_entry):
+    """Light setup that registers the entity services of the platform again."""
+
+    async def setup_entry(hass: HomeAssistant, entry: ConfigEntry, *args) -> None:
+        await async_setup_entry(hass, entry, *args)
+        platform = entity_platform.async_get_current_platform()
+        for service, get_schema in _ENTITY_SERVICES.items():
+            platform.async_register_entity_service(
+                service, get_schema(), _noop_entity_service
+            )
+
+    return setup_entry
+
+
+async def _setup(entries: int, per_entry: bool) -> float:
+    hosts = [f"10.0.{i // 256}.{i % 256}" for i in range(entries)]
+    with tempfile.TemporaryDirectory() as config_dir, ExitStack() as stack:
+        hass = await start_hass(config_dir)
+        stack.enter_context(without_connections())
+        if per_entry:
+            stack.enter_context(
+                patch.object(
+                    integration, "async_setup_services", _without_domain_services
+                )
+            )
+            stack.enter_context(
+                patch.object(
+                    light,
+                    "async_setup_entry",
+                    _with_entity_services(light.async_setup_entry),
+                )
+            )
+
+        started = time.perf_counter()
+        await add_entries(hass, hosts)
+        await hass.async_block_till_done()
+        elapsed = time.perf_counter() - started
+
+        await hass.async_stop(force=True)
+    return elapsed
+
+
+async def _run(args: argparse.Namespace) -> None:
+    per_entry = await _setup(args.entries, per_entry=True)
+    once = await _setup(args.entries, per_entry=False)
+
+    print(f"{args.entries} config entries, async_setup_entry until set up")
+    print(f"  services per entry: {per_entry * 1000:10.1f} ms")
+    print(f"  services once:      {once * 1000:10.1f} ms")
+    print(f"  speedup:            {per_entry / once:10.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("entries", type=int, nargs="?", default=100)
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(_run(parser.parse_args()))
@@ -7,18 +7,36 @@ import logging
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, Platform
 from homeassistant.core import HomeAssistant
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN
+from .const import CALLBACK_PROFILER, COMMAND_BATCHER, DOMAIN
+from .core.command_batcher import CommandBatcher
+from .core.profiler import CallbackProfiler
 from .core.rgbww_controller import RgbwwController
+from .services import async_setup_services
+from .transition_events import async_get_transition_listeners
 
 _logger = logging.getLogger(__name__)
 
 _PLATFORMS: list[Platform] = [Platform.LIGHT, Platform.SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
 ATTR_NAME = "name"
 DEFAULT_NAME = "World"
 
 
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the integration, services are shared by all config entries."""
+    # device triggers attached before the setup may have created them already
+    async_get_transition_listeners(hass)
+    # disabled until switched on with the set_profiling service
+    hass.data[DOMAIN][CALLBACK_PROFILER] = CallbackProfiler()
+    async_setup_services(hass)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up FHEM RGBWW Controller from a config entry."""
     # Your TODOs for creating and storing an API instance are correct.
@@ -28,13 +46,17 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     """Set up My RGB Controller from a config entry."""
     hass.data.setdefault(DOMAIN, {})
+    # shared by all controllers of the integration
+    hass.data[DOMAIN].setdefault(COMMAND_BATCHER, CommandBatcher())
 
     # Extrahiere Host aus dem ConfigEntry
     host = entry.data[CONF_HOST]
 
     # Erstelle eine Hub-Instanz für DIESES GERÄT
     # Wir übergeben die entry.unique_id (also die IP) für eine eindeutige Identifikation
-    controller = RgbwwController(hass, host)
+    controller = RgbwwController(
+        hass, host, profiler=hass.data[DOMAIN][CALLBACK_PROFILER]
+    )
     await controller.connect()
 
     entry.runtime_data = controller
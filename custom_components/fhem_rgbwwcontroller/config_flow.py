@@ -20,15 +20,22 @@ from .core.rgbww_controller import (
     RgbwwController,
 )
 from homeassistant.config_entries import (
+    ConfigEntry,
     ConfigFlow,
     ConfigFlowResult,
     OptionsFlowWithReload,
 )
 from homeassistant.const import CONF_HOST, CONF_NAME
-from homeassistant.helpers.selector import TextSelector, selector
+from homeassistant.core import callback
+from homeassistant.helpers.selector import ObjectSelector, TextSelector, selector
 from homeassistant.util import dt as dt_util
 
-from .const import DISCOVERY_RESULTS, DOMAIN
+from .const import (
+    CONF_SENSOR_DEADBAND,
+    CONF_SENSOR_MIN_INTERVAL,
+    DISCOVERY_RESULTS,
+    DOMAIN,
+)
 from .core import controller_autodetect
 
 _logger = logging.getLogger(__name__)
@@ -59,6 +66,11 @@ class RgbwwConfigFlow(ConfigFlow, domain=DOMAIN):
         self._scan_monitor_task: asyncio.TaskGroup | None = None
         self._scan_network: ipaddress.IPv4Network | None = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> RgbwwFlowHandler:
+        return RgbwwFlowHandler()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -233,8 +245,8 @@ class RgbwwConfigFlow(ConfigFlow, domain=DOMAIN):
     async def _create_entry_from_host(self, host: str, title: str):
         controller = RgbwwController(self.hass, host)
         try:
-            # just check if reachable
-            await controller.refresh()
+            # just check if reachable, only the MAC address is needed
+            await controller.refresh(("info",))
         except HTTPError:
             raise _InvalidHostError(host)
 
@@ -264,7 +276,7 @@ class RgbwwConfigFlow(ConfigFlow, domain=DOMAIN):
         ) is None:
             ctrl = RgbwwController(user_input[CONF_HOST])
             try:
-                await ctrl.refresh()
+                await ctrl.refresh(("info",))
             except HTTPError:
                 self.async_abort(reason="cannot_connect")
 
@@ -286,7 +298,7 @@ class RgbwwConfigFlow(ConfigFlow, domain=DOMAIN):
             controller = RgbwwController(self.hass, host)
             try:
                 # just check if reachable
-                await controller.refresh()
+                await controller.refresh(("info",))
             except HTTPError:
                 errors[CONF_HOST] = f"Cannot retrieve MAC address from host {host}"
                 cur_data = user_input
@@ -367,26 +379,49 @@ OPTIONS_SCHEMA = vol.Schema(
 )
 
 
+# {sensor key: value} of the sensor options, see sensor._RecordingFilter
+_SENSOR_OPTION_SCHEMA = vol.Schema({str: vol.All(vol.Coerce(float), vol.Range(min=0))})
+
+
 class RgbwwFlowHandler(OptionsFlowWithReload):
     async def async_step_init(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
         """Manage the options."""
         errors: dict[str, str] = {}
+        options = self.config_entry.options
 
         if user_input is not None:
-            return self.async_create_entry(data=user_input)
+            for key in (CONF_SENSOR_DEADBAND, CONF_SENSOR_MIN_INTERVAL):
+                try:
+                    user_input[key] = _SENSOR_OPTION_SCHEMA(user_input.get(key, {}))
+                except vol.Invalid:
+                    errors[key] = "invalid_sensor_option"
+            if not errors:
+                # the form does not show every option, keep the others
+                return self.async_create_entry(data={**options, **user_input})
+            options = {**options, **user_input}
 
         return self.async_show_form(
-            step_id="mqtt",
+            step_id="init",
             data_schema=vol.Schema(
                 {
                     vol.Required(
                         "mqtt.enabled",
+                        default=options.get("mqtt.enabled", False),
                     ): bool,
                     vol.Required(
                         "mqtt.host",
+                        default=options.get("mqtt.host", ""),
                     ): str,
+                    vol.Optional(
+                        CONF_SENSOR_DEADBAND,
+                        default=options.get(CONF_SENSOR_DEADBAND, {}),
+                    ): ObjectSelector(),
+                    vol.Optional(
+                        CONF_SENSOR_MIN_INTERVAL,
+                        default=options.get(CONF_SENSOR_MIN_INTERVAL, {}),
+                    ): ObjectSelector(),
                 }
             ),
             errors=errors,
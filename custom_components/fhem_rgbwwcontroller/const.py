@@ -2,6 +2,15 @@
 
 DOMAIN = "fhem_rgbwwcontroller"
 DISCOVERY_RESULTS = "discovery_results"
+COMMAND_BATCHER = "command_batcher"
+CONTROLLER_INDEX = "controller_index"
+TRANSITION_LISTENERS = "transition_listeners"
+CALLBACK_PROFILER = "callback_profiler"
+SCENE_SNAPSHOTS = "scene_snapshots"
+
+# Config entry options, see sensor._RecordingFilter
+CONF_SENSOR_DEADBAND = "sensor_deadband"  # {sensor key: deadband}
+CONF_SENSOR_MIN_INTERVAL = "sensor_min_interval"  # {sensor key: seconds}
 
 # Attribute names used in services
 ATTR_TRANSITION_MODE = "transition_mode"
@@ -0,0 +1,105 @@
+"""Fail-fast handling of unreachable controllers."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from enum import StrEnum
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+
+class BreakerState(StrEnum):
+    CLOSED = "closed"  # requests are sent
+    OPEN = "open"  # requests fail immediately
+    HALF_OPEN = "half_open"  # a recovery probe is running, requests still fail
+
+
+class CircuitBreaker:
+    """Stops sending requests to a controller that is known to be unreachable.
+
+    The breaker opens after a few consecutive HTTP failures or when the event
+    stream connection is lost. While it is open, requests are rejected at once
+    instead of waiting for the HTTP timeout, and `probe` is called in the
+    background until the controller answers again. A reestablished event
+    stream connection closes the breaker as well.
+    """
+
+    FAILURE_THRESHOLD = 3
+    MIN_PROBE_INTERVAL = 5.0
+    MAX_PROBE_INTERVAL = 60.0
+
+    def __init__(self, probe: Callable[[], Awaitable[bool]], name: str) -> None:
+        self._probe = probe
+        self._name = name
+        self.state = BreakerState.CLOSED
+        self._failures = 0
+        self._probe_task: asyncio.Task[None] | None = None
+        self.opened_at: float | None = None
+        self.trips = 0
+        self.rejected = 0
+
+    def allow_request(self) -> bool:
+        if self.state is BreakerState.CLOSED:
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        if self.state is not BreakerState.CLOSED:
+            self._close()
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if (
+            self.state is BreakerState.CLOSED
+            and self._failures >= self.FAILURE_THRESHOLD
+        ):
+            self._open(f"{self._failures} consecutive request failures")
+
+    def on_connection_change(self, connected: bool) -> None:
+        if connected:
+            self.record_success()
+        elif self.state is BreakerState.CLOSED:
+            self._open("event stream connection lost")
+
+    def stop(self) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+
+    def _open(self, reason: str) -> None:
+        _logger.warning("%s - Circuit opened: %s", self._name, reason)
+        self.state = BreakerState.OPEN
+        self.opened_at = time.monotonic()
+        self.trips += 1
+        if self._probe_task is None:
+            self._probe_task = asyncio.get_running_loop().create_task(
+                self._run_probes(), name=f"{self._name}_recovery_probe"
+            )
+
+    def _close(self) -> None:
+        _logger.info("%s - Circuit closed", self._name)
+        self.state = BreakerState.CLOSED
+        self.opened_at = None
+        self._failures = 0
+        task, self._probe_task = self._probe_task, None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    async def _run_probes(self) -> None:
+        interval = self.MIN_PROBE_INTERVAL
+        try:
+            while self.state is not BreakerState.CLOSED:
+                await asyncio.sleep(interval)
+                self.state = BreakerState.HALF_OPEN
+                if await self._probe():
+                    self.record_success()
+                    return
+                if self.state is BreakerState.HALF_OPEN:
+                    self.state = BreakerState.OPEN
+                interval = min(interval * 2, self.MAX_PROBE_INTERVAL)
+        finally:
+            if self._probe_task is asyncio.current_task():
+                self._probe_task = None
@@ -28,7 +28,7 @@ class _QueuePolicy(StrEnum):
     SINGLE = "single"
 
 
-@dataclass
+@dataclass(slots=True)
 class ColorCommandBase:
     """Internal representation of a color command."""
 
@@ -40,6 +40,17 @@ class ColorCommandBase:
     anim_name: str | None = None
     direction_long: bool | None = False  # True if long, False if short
 
+    def _base_key(self) -> tuple[Any, ...]:
+        return (
+            self.speed_or_fade_duration,
+            self.use_speed,
+            self.stay,
+            self.requeue,
+            self.queue_policy,
+            self.anim_name,
+            self.direction_long,
+        )
+
     @classmethod
     def _gather_service_base_args(cls, service_attrs: dict[str, Any]) -> dict[str, Any]:
         args: dict[str, Any] = {}
@@ -64,7 +75,7 @@ class ColorCommandBase:
         return args
 
 
-@dataclass
+@dataclass(slots=True)
 class ColorCommandHsv(ColorCommandBase):
     """Represents a single step in an animation sequence."""
 
@@ -73,9 +84,13 @@ class ColorCommandHsv(ColorCommandBase):
     v: str | None = None
     ct: str | None = None
 
+    def dedupe_key(self) -> tuple[Any, ...]:
+        """Hashable key, equal for commands with equal fields."""
+        return ("hsv", *self._base_key(), self.h, self.s, self.v, self.ct)
+
     @classmethod
     def from_service(cls, service_attrs: dict[str, Any]) -> Self:
-        attrs = super()._gather_service_base_args(service_attrs)
+        attrs = cls._gather_service_base_args(service_attrs)
 
         if (val := service_attrs.get(ATTR_HUE)) is not None:
             attrs["h"] = val
@@ -92,7 +107,7 @@ class ColorCommandHsv(ColorCommandBase):
         return cls(**attrs)
 
 
-@dataclass
+@dataclass(slots=True)
 class ColorCommandRgbww(ColorCommandBase):
     """Represents a single step in an animation sequence."""
 
@@ -102,9 +117,13 @@ class ColorCommandRgbww(ColorCommandBase):
     cw: str | None = None
     ww: str | None = None
 
+    def dedupe_key(self) -> tuple[Any, ...]:
+        """Hashable key, equal for commands with equal fields."""
+        return ("raw", *self._base_key(), self.r, self.g, self.b, self.cw, self.ww)
+
     @classmethod
     def from_service(cls, service_attrs: dict[str, Any]) -> Self:
-        attrs = super()._gather_service_base_args(service_attrs)
+        attrs = cls._gather_service_base_args(service_attrs)
 
         if (val := service_attrs.get(ATTR_CH_RED)) is not None:
             attrs["r"] = val
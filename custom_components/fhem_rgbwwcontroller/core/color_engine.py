@@ -0,0 +1,190 @@
+"""HSV+CT to RGBWW rendering as done by the controller firmware.
+
+The firmware splits an HSV color into a chromatic part that is driven on the
+RGB channels and an achromatic part (the minimum of R, G and B) that is
+driven on the white channels. Depending on the output mode of the controller
+config (`color.outputmode`) the white part is distributed between warm and
+cold white according to the color temperature and the `color.colortemp`
+calibration, driven on a single white channel, or added to the RGB channels.
+The hue corrections (`color.hsv`) move the primary colors on the hue wheel and
+the per channel brightness (`color.brightness`) scales the outputs. Only the
+default hue model (`color.hsv.model` 0) is rendered. Channel values are 10 bit
+(0-1023).
+
+All conversions use lookup tables computed at import time (or when the
+config is loaded), so rendering one event costs a handful of index operations.
+"""
+
+from enum import IntEnum
+from typing import Any, Self
+
+RAW_MAX = 1023
+
+# 10 bit channel value -> 0..255
+RAW_TO_8BIT = tuple(round(i * 255 / RAW_MAX) for i in range(RAW_MAX + 1))
+# 0..255 -> 10 bit channel value
+EIGHT_BIT_TO_RAW = tuple(round(i * RAW_MAX / 255) for i in range(256))
+# percent (0..100) -> 0..255
+PERCENT_TO_8BIT = tuple(round(i * 255 / 100) for i in range(101))
+
+
+def _hue_to_rgb(hue: float) -> tuple[float, float, float]:
+    """Fully saturated color of `hue` degrees, channels 0..1."""
+    sector, fract = divmod(hue / 60, 1)
+    rising, falling = fract, 1 - fract
+    return (
+        (1, rising, 0),
+        (falling, 1, 0),
+        (0, 1, rising),
+        (0, falling, 1),
+        (rising, 0, 1),
+        (1, 0, falling),
+    )[int(sector) % 6]
+
+
+# hue in whole degrees -> fully saturated RGB
+HUE_TABLE = tuple(_hue_to_rgb(h) for h in range(360))
+
+# hues of red, yellow, green, cyan, blue and magenta
+_PRIMARY_HUES = (0, 60, 120, 180, 240, 300)
+_HUE_CORRECTION_KEYS = ("red", "yellow", "green", "cyan", "blue", "magenta")
+
+
+class OutputMode(IntEnum):
+    """`color.outputmode` of the controller config."""
+
+    RGBWWCW = 0
+    RGBWW = 1
+    RGBCW = 2
+    RGB = 3
+
+
+def _corrected_hue_table(
+    offsets: tuple[float, ...],
+) -> tuple[tuple[float, float, float], ...]:
+    """Hue table with each primary color moved by its offset in degrees.
+
+    The hue `primary + offset` renders the primary color itself, the hues in
+    between are mapped linearly.
+    """
+    points = [hue + offset for hue, offset in zip(_PRIMARY_HUES, offsets, strict=True)]
+    table = []
+    for hue in range(360):
+        rendered: float = hue
+        for i, start in enumerate(points):
+            width = (points[(i + 1) % 6] - start) % 360
+            if width and (hue - start) % 360 < width:
+                rendered = _PRIMARY_HUES[i] + (hue - start) % 360 * 60 / width
+                break
+        table.append(_hue_to_rgb(rendered))
+    return tuple(table)
+
+
+def raw_to_8bit(value: float) -> int:
+    return RAW_TO_8BIT[min(max(int(value), 0), RAW_MAX)]
+
+
+def eight_bit_to_raw(value: float) -> int:
+    return EIGHT_BIT_TO_RAW[min(max(int(value), 0), 255)]
+
+
+def percent_to_8bit(value: float) -> int:
+    return PERCENT_TO_8BIT[min(max(int(value), 0), 100)]
+
+
+class ColorEngine:
+    """Renders HSV+CT colors to the five output channels of a controller."""
+
+    __slots__ = ("_brightness", "_hue_table", "cw_kelvin", "output_mode", "ww_kelvin")
+
+    def __init__(
+        self,
+        ww_kelvin: int = 2700,
+        cw_kelvin: int = 6000,
+        output_mode: OutputMode = OutputMode.RGBWWCW,
+        brightness: tuple[float, float, float, float, float] = (100,) * 5,
+        hue_offsets: tuple[float, ...] = (0,) * 6,
+    ) -> None:
+        """`brightness` in percent per (r, g, b, cw, ww) channel, `hue_offsets`
+        in degrees for red, yellow, green, cyan, blue and magenta.
+        """
+        self.ww_kelvin = ww_kelvin
+        self.cw_kelvin = cw_kelvin
+        self.output_mode = output_mode
+        self._brightness = tuple(min(max(x, 0), 100) / 100 for x in brightness)
+        self._hue_table = (
+            _corrected_hue_table(hue_offsets) if any(hue_offsets) else HUE_TABLE
+        )
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> Self:
+        color = config["color"]
+        colortemp = color["colortemp"]
+        brightness = color.get("brightness", {})
+        hsv = color.get("hsv", {})
+        return cls(
+            ww_kelvin=colortemp["ww"],
+            cw_kelvin=colortemp["cw"],
+            output_mode=OutputMode(color.get("outputmode", OutputMode.RGBWWCW)),
+            brightness=(
+                brightness.get("red", 100),
+                brightness.get("green", 100),
+                brightness.get("blue", 100),
+                brightness.get("cw", 100),
+                brightness.get("ww", 100),
+            ),
+            hue_offsets=tuple(hsv.get(key, 0) for key in _HUE_CORRECTION_KEYS),
+        )
+
+    def _cold_share(self, ct: float) -> float:
+        """Share of the white part driven on the cold white channel."""
+        if not ct or self.cw_kelvin <= self.ww_kelvin:
+            return 0.5
+        share = (ct - self.ww_kelvin) / (self.cw_kelvin - self.ww_kelvin)
+        return min(max(share, 0.0), 1.0)
+
+    def hsv_to_raw(
+        self, hue: float, saturation: float, value: float, ct: float
+    ) -> tuple[int, int, int, int, int]:
+        """Return the (r, g, b, cw, ww) channel values for an HSV+CT color.
+
+        Hue is in degrees, saturation and value in percent, ct in Kelvin.
+        """
+        val = min(max(value, 0), 100) * RAW_MAX / 100
+        chroma = val * min(max(saturation, 0), 100) / 100
+        white = val - chroma
+
+        hr, hg, hb = self._hue_table[int(hue) % 360]
+        r, g, b = chroma * hr, chroma * hg, chroma * hb
+        match self.output_mode:
+            case OutputMode.RGB:
+                r, g, b, cw, ww = r + white, g + white, b + white, 0.0, 0.0
+            case OutputMode.RGBWW:
+                cw, ww = 0.0, white
+            case OutputMode.RGBCW:
+                cw, ww = white, 0.0
+            case _:
+                cw = white * self._cold_share(ct)
+                ww = white - cw
+
+        br, bg, bb, bcw, bww = self._brightness
+        return (
+            round(r * br),
+            round(g * bg),
+            round(b * bb),
+            round(cw * bcw),
+            round(ww * bww),
+        )
+
+    def hsv_to_rgbww(
+        self, hue: float, saturation: float, value: float, ct: float
+    ) -> tuple[int, int, int, int, int]:
+        """Same as `hsv_to_raw`, scaled to 0..255 for Home Assistant."""
+        r, g, b, cw, ww = self.hsv_to_raw(hue, saturation, value, ct)
+        return (
+            RAW_TO_8BIT[r],
+            RAW_TO_8BIT[g],
+            RAW_TO_8BIT[b],
+            RAW_TO_8BIT[cw],
+            RAW_TO_8BIT[ww],
+        )
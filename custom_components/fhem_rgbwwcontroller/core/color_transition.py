@@ -0,0 +1,222 @@
+"""Client-side model of a transition running on the controller.
+
+The controller only reports its color when it pushes a `color_event`. To keep
+the Home Assistant state current while a fade is running, the transition that
+was started by one of our own commands is remembered and interpolated locally.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Literal, Self
+
+from .color_commands import ColorCommandHsv, ColorCommandRgbww, _QueuePolicy
+
+# Queue policies for which the firmware starts the new step immediately
+_IMMEDIATE_POLICIES = (
+    None,
+    _QueuePolicy.SINGLE,
+    _QueuePolicy.FRONT,
+    _QueuePolicy.FRONT_RESET,
+)
+
+# command attribute -> (_ColorState field, lower bound, upper bound, speed scale)
+# The speed scale converts the controller speed unit (degree per minute for hue,
+# percentage points per minute for all other channels) to the channel's unit.
+_HSV_CHANNELS: dict[str, tuple[str, float | None, float | None, float]] = {
+    "h": ("hue", None, None, 1.0),
+    "s": ("saturation", 0, 100, 1.0),
+    "v": ("brightness", 0, 100, 1.0),
+    "ct": ("color_temp", None, None, 1.0),
+}
+
+_RAW_CHANNELS: dict[str, tuple[str, float | None, float | None, float]] = {
+    "r": ("raw_r", 0, 1023, 10.23),
+    "g": ("raw_g", 0, 1023, 10.23),
+    "b": ("raw_b", 0, 1023, 10.23),
+    "cw": ("raw_cw", 0, 1023, 10.23),
+    "ww": ("raw_ww", 0, 1023, 10.23),
+}
+
+
+def _parse_target(value: Any, current: float) -> tuple[float, bool] | None:
+    """Return the target value and whether it was given relative to the current value."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value), False
+
+    value = str(value).strip()
+    if not value:
+        return None
+    try:
+        if value[0] in "+-":
+            return current + float(value), True
+        return float(value), False
+    except ValueError:
+        return None
+
+
+def static_target(
+    cmd: ColorCommandHsv | ColorCommandRgbww,
+) -> tuple[Literal["raw", "hsv"], dict[str, float]] | None:
+    """Return the color mode and absolute channel targets of a plain color command.
+
+    Returns None for everything that is more than "go to this color at once":
+    fades, queued or named steps, stay times, requeued steps and relative values.
+    A fade must be sent even to the color that is already shown, it stops a
+    transition that may still be running towards another color.
+    """
+    if (
+        cmd.speed_or_fade_duration
+        or cmd.queue_policy not in (None, _QueuePolicy.SINGLE)
+        or cmd.stay
+        or cmd.requeue
+        or cmd.anim_name is not None
+    ):
+        return None
+
+    if isinstance(cmd, ColorCommandHsv):
+        mapping, color_mode = _HSV_CHANNELS, "hsv"
+    else:
+        mapping, color_mode = _RAW_CHANNELS, "raw"
+
+    targets: dict[str, float] = {}
+    for attr, (field, lower, upper, _) in mapping.items():
+        parsed = _parse_target(getattr(cmd, attr), 0.0)
+        if parsed is None:
+            continue
+        target, relative = parsed
+        if relative:
+            return None
+        if field == "hue":
+            target %= 360
+        if lower is not None:
+            target = max(lower, target)
+        if upper is not None:
+            target = min(upper, target)
+        targets[field] = target
+
+    if not targets:
+        return None
+    return color_mode, targets
+
+
+@dataclass(slots=True)
+class _ChannelTransition:
+    field: str
+    start: float
+    target: float
+    duration: float  # seconds
+
+    def value_at(self, elapsed: float) -> float:
+        if elapsed >= self.duration:
+            return self.target
+        return self.start + (self.target - self.start) * (elapsed / self.duration)
+
+
+class ColorTransition:
+    """A transition started by a command we sent, interpolated on read."""
+
+    __slots__ = ("_channels", "color_mode", "name", "started")
+
+    def __init__(
+        self,
+        channels: list[_ChannelTransition],
+        color_mode: Literal["raw", "hsv"],
+        name: str | None,
+        started: float,
+    ) -> None:
+        self._channels = channels
+        self.color_mode = color_mode
+        self.name = name
+        self.started = started
+
+    @classmethod
+    def from_command(
+        cls, cmd: ColorCommandHsv | ColorCommandRgbww, color: Any, now: float
+    ) -> Self | None:
+        """Build the transition for `cmd` starting from `color`.
+
+        Returns None if the command does not start immediately on the controller.
+        """
+        if cmd.queue_policy not in _IMMEDIATE_POLICIES:
+            return None
+
+        if isinstance(cmd, ColorCommandHsv):
+            mapping, color_mode = _HSV_CHANNELS, "hsv"
+        else:
+            mapping, color_mode = _RAW_CHANNELS, "raw"
+
+        channels: list[_ChannelTransition] = []
+        for attr, (field, lower, upper, speed_scale) in mapping.items():
+            start = float(getattr(color, field))
+            parsed = _parse_target(getattr(cmd, attr), start)
+            if parsed is None:
+                continue
+            target, relative = parsed
+
+            if field == "hue" and not relative:
+                delta = (target - start) % 360
+                if cmd.direction_long:
+                    if 0 < delta < 180:
+                        delta -= 360
+                elif delta > 180:
+                    delta -= 360
+                target = start + delta
+
+            if lower is not None:
+                target = max(lower, target)
+            if upper is not None:
+                target = min(upper, target)
+
+            value = cmd.speed_or_fade_duration or 0
+            if cmd.use_speed:
+                speed = value * speed_scale
+                duration = abs(target - start) / speed * 60 if speed else 0.0
+            else:
+                duration = value / 1000
+
+            channels.append(_ChannelTransition(field, start, target, duration))
+
+        return cls(channels, color_mode, cmd.anim_name, now)
+
+    @property
+    def end(self) -> float:
+        """Monotonic time at which all channels have reached their target."""
+        return self.started + max((c.duration for c in self._channels), default=0.0)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.started
+
+    def targets(self) -> dict[str, float]:
+        """Final value of every channel touched by the transition."""
+        return {
+            ch.field: ch.target % 360 if ch.field == "hue" else ch.target
+            for ch in self._channels
+        }
+
+    def is_running(self, now: float) -> bool:
+        return now < self.end
+
+    def apply(self, color: Any, now: float) -> None:
+        """Write the interpolated values at `now` into `color`."""
+        elapsed = now - self.started
+        color.color_mode = self.color_mode
+        for ch in self._channels:
+            value = ch.value_at(elapsed)
+            if ch.field == "hue":
+                value %= 360
+            setattr(color, ch.field, round(value))
+
+    def rebase(self, color: Any, now: float) -> None:
+        """Continue the transition from the state just reported by the controller."""
+        elapsed = now - self.started
+        for ch in self._channels:
+            predicted = ch.value_at(elapsed)
+            reported = float(getattr(color, ch.field))
+            if ch.field == "hue":
+                # unwrap the reported hue so the remaining path keeps its direction
+                reported = predicted + ((reported - predicted + 180) % 360 - 180)
+            ch.start = reported
+            ch.duration = max(0.0, ch.duration - elapsed)
+        self.started = now
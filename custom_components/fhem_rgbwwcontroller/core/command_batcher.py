@@ -0,0 +1,70 @@
+"""Fleet-wide batching of color commands issued by service calls."""
+
+import asyncio
+from collections.abc import Callable, Hashable, Sequence
+from typing import Any, Literal
+
+from .color_commands import ColorCommandHsv, ColorCommandRgbww
+from .rgbww_controller import PreparedColorCommands, RgbwwController
+from .send_pipeline import SendResult
+
+
+class CommandBatcher:
+    """Shares prepared payloads between service calls of the same event loop tick.
+
+    When a scene or automation targets many lights, Home Assistant calls every
+    entity with the same data in the same loop iteration. The first call of a
+    tick builds and serializes the payload, all others with the same key reuse
+    it. Sending is limited by a fleet-wide concurrency cap.
+    """
+
+    def __init__(self, max_concurrency: int = 32) -> None:
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._prepared: dict[Hashable, PreparedColorCommands] = {}
+        self._clear_scheduled = False
+        self.calls = 0
+        self.deduplicated = 0
+
+    async def send(
+        self,
+        controller: RgbwwController,
+        key: Hashable,
+        build: Callable[[], Sequence[ColorCommandHsv | ColorCommandRgbww]],
+        skip_unchanged: bool = True,
+    ) -> SendResult:
+        """Send the commands returned by `build` unless prepared for `key` in this tick."""
+        self.calls += 1
+        if (prepared := self._prepared.get(key)) is None:
+            prepared = PreparedColorCommands.from_commands(build())
+            self._prepared[key] = prepared
+            if not self._clear_scheduled:
+                self._clear_scheduled = True
+                asyncio.get_running_loop().call_soon(self._clear)
+        else:
+            self.deduplicated += 1
+
+        return await self.send_prepared(controller, prepared, skip_unchanged)
+
+    async def send_prepared(
+        self,
+        controller: RgbwwController,
+        prepared: PreparedColorCommands,
+        skip_unchanged: bool = True,
+    ) -> SendResult:
+        """Send already prepared commands under the fleet-wide concurrency cap."""
+        async with self._semaphore:
+            return await controller.send_prepared(prepared, skip_unchanged)
+
+    async def send_channel_command(
+        self,
+        controller: RgbwwController,
+        command: Literal["pause", "continue", "stop"],
+        data: dict[str, Any],
+    ) -> None:
+        """Send a prepared channel command under the fleet-wide concurrency cap."""
+        async with self._semaphore:
+            await controller.send_prepared_channel_command(command, data)
+
+    def _clear(self) -> None:
+        self._prepared.clear()
+        self._clear_scheduled = False
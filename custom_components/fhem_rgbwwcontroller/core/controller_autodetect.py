@@ -41,7 +41,10 @@ async def _check_ip(hass: HomeAssistant, ip: str) -> RgbwwController | None:
         controller = RgbwwController(hass, ip, http_request_timeout=2)
 
         try:
-            await controller.refresh()
+            # dead hosts only get the info request, the config is needed for
+            # the device name in the results
+            await controller.refresh(("info",))
+            await controller.refresh(("config",))
             mac = controller.info["connection"]["mac"]
             _logger.debug("Found device at %s with MAC %s", ip, mac)
         except ControllerUnavailableError:
@@ -0,0 +1,133 @@
+"""Built-in light effects, rendered as hardware animations.
+
+Every effect is a short list of HSV animation steps that loop on the
+controller via the requeue flag (or run once, like sunrise). The payloads are
+built and serialized once per effect and brightness and then reused, so
+starting an effect is a single prebuilt POST.
+
+Only the last step of the effects that end (sunrise, sunset) is named, so it
+can be awaited and used as a trigger. Every named step makes the controller
+send a `transition_finished` event, which is recorded, and the steps of the
+looping effects finish several times per second.
+"""
+
+from collections.abc import Callable
+import functools
+
+from .color_commands import ColorCommandHsv, _QueuePolicy
+from .rgbww_controller import PreparedColorCommands
+
+_ANIM_NAME_PREFIX = "effect_"
+
+
+def _step(
+    name: str,
+    first: bool,
+    duration: int,
+    *,
+    h: float | str | None = None,
+    s: float | None = None,
+    v: float | None = None,
+    ct: float | None = None,
+    stay: int | None = None,
+    requeue: bool = True,
+    named: bool = False,
+) -> ColorCommandHsv:
+    # the first step replaces whatever runs, all others are appended behind it
+    return ColorCommandHsv(
+        speed_or_fade_duration=duration,
+        stay=stay,
+        requeue=requeue or None,
+        queue_policy=_QueuePolicy.SINGLE if first else _QueuePolicy.BACK,
+        anim_name=f"{_ANIM_NAME_PREFIX}{name}" if named else None,
+        h=h,
+        s=s,
+        v=v,
+        ct=ct,
+    )
+
+
+def _rainbow(v: int) -> list[ColorCommandHsv]:
+    return [_step("rainbow", True, 1000, h="+15", s=100, v=v)]
+
+
+def _colorloop(v: int) -> list[ColorCommandHsv]:
+    return [_step("colorloop", True, 10000, h="+30", s=80, v=v)]
+
+
+def _breathe(v: int) -> list[ColorCommandHsv]:
+    low = max(1, v // 10)
+    return [
+        _step("breathe", True, 2000, v=v, stay=300),
+        _step("breathe", False, 2000, v=low, stay=300),
+    ]
+
+
+def _candle(v: int) -> list[ColorCommandHsv]:
+    # (brightness factor, fade duration in ms) of the flicker steps
+    levels = (
+        (1.0, 180),
+        (0.75, 120),
+        (0.9, 250),
+        (0.65, 90),
+        (0.85, 200),
+        (0.7, 150),
+    )
+    return [
+        _step("candle", i == 0, duration, h=28, s=90, v=max(1, round(v * level)))
+        for i, (level, duration) in enumerate(levels)
+    ]
+
+
+def _alarm(v: int) -> list[ColorCommandHsv]:
+    return [
+        _step("alarm", True, 150, h=0, s=100, v=v, stay=350),
+        _step("alarm", False, 150, h=0, s=100, v=0, stay=350),
+    ]
+
+
+def _sunrise(v: int) -> list[ColorCommandHsv]:
+    return [
+        _step("sunrise", True, 0, h=0, s=100, v=1, requeue=False),
+        _step("sunrise", False, 300000, h=20, s=100, v=max(1, v // 2), requeue=False),
+        _step(
+            "sunrise",
+            False,
+            300000,
+            h=40,
+            s=30,
+            v=v,
+            ct=2700,
+            requeue=False,
+            named=True,
+        ),
+    ]
+
+
+def _sunset(v: int) -> list[ColorCommandHsv]:
+    return [
+        _step("sunset", True, 300000, h=20, s=100, v=max(1, v // 2), requeue=False),
+        _step("sunset", False, 300000, h=0, s=100, v=0, requeue=False, named=True),
+    ]
+
+
+_EFFECTS: dict[str, Callable[[int], list[ColorCommandHsv]]] = {
+    "rainbow": _rainbow,
+    "colorloop": _colorloop,
+    "breathe": _breathe,
+    "candle": _candle,
+    "alarm": _alarm,
+    "sunrise": _sunrise,
+    "sunset": _sunset,
+}
+
+EFFECT_LIST = list(_EFFECTS)
+
+
+@functools.lru_cache(maxsize=len(_EFFECTS) * 101)
+def get_effect(name: str, brightness: int = 100) -> PreparedColorCommands:
+    """Return the prepared animation of effect `name` at `brightness` percent."""
+    if name not in _EFFECTS:
+        raise ValueError(f"Unknown effect: {name}")
+    brightness = min(max(int(brightness), 1), 100)
+    return PreparedColorCommands.from_commands(_EFFECTS[name](brightness))
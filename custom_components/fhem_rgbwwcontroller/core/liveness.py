@@ -0,0 +1,75 @@
+"""Dead connection detection for the controller event stream."""
+
+import logging
+import socket
+
+_logger = logging.getLogger(__name__)
+
+# TCP keepalive: first probe after 5 s idle, then every 2 s, give up after 3
+_TCP_KEEPIDLE = 5
+_TCP_KEEPINTVL = 2
+_TCP_KEEPCNT = 3
+
+
+def configure_tcp_keepalive(sock: socket.socket | None) -> None:
+    """Enable aggressive TCP keepalive so the kernel notices a vanished peer."""
+    if sock is None:
+        return
+
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, _TCP_KEEPIDLE)
+        elif hasattr(socket, "TCP_KEEPALIVE"):  # macOS
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, _TCP_KEEPIDLE)
+        if hasattr(socket, "TCP_KEEPINTVL"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, _TCP_KEEPINTVL)
+        if hasattr(socket, "TCP_KEEPCNT"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, _TCP_KEEPCNT)
+    except OSError as e:
+        _logger.debug("Could not configure TCP keepalive: %s", e)
+
+
+class LivenessMonitor:
+    """Learns the keep_alive cadence of the controller.
+
+    The returned silence timeout is a multiple of the observed keep_alive
+    interval, so a silent connection is probed after a few seconds instead of
+    waiting for the fixed watchdog timeout.
+    """
+
+    FACTOR = 2.5
+    MIN_TIMEOUT = 3.0
+    _ALPHA = 0.2  # weight of a new sample in the moving average
+
+    __slots__ = ("_interval", "_last_keep_alive", "max_timeout")
+
+    def __init__(self, max_timeout: float) -> None:
+        self.max_timeout = max_timeout
+        self._interval: float | None = None
+        self._last_keep_alive: float | None = None
+
+    def on_keep_alive(self, now: float) -> None:
+        if self._last_keep_alive is not None:
+            sample = now - self._last_keep_alive
+            if self._interval is None:
+                self._interval = sample
+            else:
+                self._interval += self._ALPHA * (sample - self._interval)
+        self._last_keep_alive = now
+
+    def on_disconnect(self) -> None:
+        # keep the learned cadence, but the next interval starts with a new connection
+        self._last_keep_alive = None
+
+    @property
+    def keep_alive_interval(self) -> float | None:
+        return self._interval
+
+    @property
+    def silence_timeout(self) -> float:
+        """Time without any data after which the connection is probed."""
+        if self._interval is None:
+            return self.max_timeout
+        timeout = max(self.MIN_TIMEOUT, self._interval * self.FACTOR)
+        return min(self.max_timeout, timeout)
@@ -0,0 +1,169 @@
+"""Lightweight performance counters of a single controller.
+
+All storage is preallocated (`array` based) so recording a sample does not
+allocate and the counters can stay enabled in production.
+"""
+
+from array import array
+from bisect import bisect_left
+import time
+
+# Upper bounds of the latency buckets in seconds, the last bucket is unbounded
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.02,
+    0.05,
+    0.1,
+    0.2,
+    0.5,
+    1.0,
+    2.0,
+    5.0,
+    10.0,
+    20.0,
+)
+
+# Methods the controller pushes via the TCP connection
+EVENT_METHODS = (
+    "color_event",
+    "transition_finished",
+    "info",
+    "config",
+    "keep_alive",
+    "state_completed",
+    "clock_slave_status",
+    "unknown",
+)
+
+# HTTP endpoints of the controller that we use
+HTTP_ENDPOINTS = (
+    "color",
+    "info",
+    "config",
+    "pause",
+    "continue",
+    "stop",
+    "skip",
+)
+
+_EVENT_INDEX = {m: i for i, m in enumerate(EVENT_METHODS)}
+_UNKNOWN_EVENT = _EVENT_INDEX["unknown"]
+
+
+class LatencyHistogram:
+    """Fixed bucket latency histogram."""
+
+    __slots__ = ("_bins", "_buckets", "count", "max", "total")
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self._buckets = buckets
+        self._bins = array("Q", bytes(8 * (len(buckets) + 1)))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self._bins[bisect_left(self._buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add the samples of `other`, which must use the same buckets."""
+        for i, v in enumerate(other._bins):
+            self._bins[i] += v
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float | None:
+        """Estimate the q-quantile (0..1) as the upper bound of its bucket."""
+        if self.count == 0:
+            return None
+
+        rank = q * self.count
+        cumulative = 0
+        for i, v in enumerate(self._bins):
+            cumulative += v
+            if cumulative >= rank and v:
+                if i < len(self._buckets):
+                    return min(self._buckets[i], self.max)
+                return self.max
+        return self.max
+
+    @property
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def summary(self) -> dict[str, float | int | None]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.max if self.count else None,
+        }
+
+
+class ControllerMetrics:
+    """Performance counters of one controller."""
+
+    __slots__ = (
+        "_events",
+        "bytes_received",
+        "commands_sent",
+        "commands_skipped",
+        "http_errors",
+        "http_latency",
+        "last_event",
+        "liveness_probes",
+        "reconnects",
+        "watchdog_timeouts",
+    )
+
+    def __init__(self) -> None:
+        self.http_latency = {e: LatencyHistogram() for e in HTTP_ENDPOINTS}
+        self.http_errors = 0
+        self.commands_sent = 0
+        self.commands_skipped = 0
+        self._events = array("Q", bytes(8 * len(EVENT_METHODS)))
+        self.bytes_received = 0
+        self.reconnects = 0
+        self.watchdog_timeouts = 0
+        self.liveness_probes = 0
+        self.last_event: float | None = None
+
+    def record_event(self, method: str) -> None:
+        self._events[_EVENT_INDEX.get(method, _UNKNOWN_EVENT)] += 1
+        self.last_event = time.monotonic()
+
+    def record_http(self, endpoint: str, seconds: float, ok: bool) -> None:
+        if (hist := self.http_latency.get(endpoint)) is None:
+            hist = self.http_latency[endpoint] = LatencyHistogram()
+        hist.record(seconds)
+        if not ok:
+            self.http_errors += 1
+
+    @property
+    def events(self) -> dict[str, int]:
+        return dict(zip(EVENT_METHODS, self._events, strict=True))
+
+    @property
+    def events_total(self) -> int:
+        return sum(self._events)
+
+    @property
+    def http_latency_total(self) -> LatencyHistogram:
+        hist = LatencyHistogram()
+        for x in self.http_latency.values():
+            hist.merge(x)
+        return hist
+
+    @property
+    def seconds_since_last_event(self) -> float | None:
+        if self.last_event is None:
+            return None
+        return time.monotonic() - self.last_event
@@ -0,0 +1,83 @@
+"""Opt-in timing of the callbacks that run on the event loop."""
+
+from collections.abc import Callable
+import logging
+import time
+from typing import Any
+
+from .metrics import LatencyHistogram
+
+_logger = logging.getLogger(__name__)
+
+# Upper bounds of the callback duration buckets in seconds, the last bucket is unbounded
+CALLBACK_BUCKETS = (
+    0.0001,
+    0.0002,
+    0.0005,
+    0.001,
+    0.002,
+    0.005,
+    0.01,
+    0.02,
+    0.05,
+    0.1,
+    0.2,
+    0.5,
+)
+
+
+class CallbackProfiler:
+    """Times the message dispatches and entity callbacks of all controllers.
+
+    Messages of the event stream are handled synchronously on the event loop,
+    including the callbacks of the entities. While enabled, every dispatch
+    (`dispatch.<method>`, including its callbacks) and every callback
+    (`<class>.<method>`) is recorded in a histogram per handler, and calls
+    longer than `threshold` seconds are logged. While disabled the controllers
+    call their callbacks directly.
+    """
+
+    DEFAULT_THRESHOLD = 0.05
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.threshold = self.DEFAULT_THRESHOLD
+        self.slow_calls = 0
+        self.histograms: dict[str, LatencyHistogram] = {}
+
+    def reset(self) -> None:
+        self.histograms.clear()
+        self.slow_calls = 0
+
+    def call(
+        self, handler: str, host: str, func: Callable[..., Any], *args: Any
+    ) -> None:
+        start = time.perf_counter()
+        try:
+            func(*args)
+        finally:
+            self._record(handler, host, time.perf_counter() - start)
+
+    def _record(self, handler: str, host: str, seconds: float) -> None:
+        if (hist := self.histograms.get(handler)) is None:
+            hist = self.histograms[handler] = LatencyHistogram(CALLBACK_BUCKETS)
+        hist.record(seconds)
+        if seconds > self.threshold:
+            self.slow_calls += 1
+            _logger.warning(
+                "%s - %s blocked the event loop for %.1f ms",
+                host,
+                handler,
+                seconds * 1000,
+            )
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "slow_calls": self.slow_calls,
+            "handlers": {
+                handler: hist.summary()
+                for handler, hist in sorted(self.histograms.items())
+            },
+        }
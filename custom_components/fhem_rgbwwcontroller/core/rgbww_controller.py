@@ -1,31 +1,43 @@
 import asyncio
-from collections.abc import Sequence
+from collections.abc import Collection, Sequence
 import contextlib
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, replace
 import json
 import logging
+import math
 import os
-import random
 import time
 from typing import Any, Literal, Protocol, Self
 
-from aiohttp import ClientError
+from aiohttp import ClientError, ClientResponseError
 
 from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .color_commands import ColorCommandBase, ColorCommandHsv, ColorCommandRgbww
+from .color_commands import (
+    ColorCommandBase,
+    ColorCommandHsv,
+    ColorCommandRgbww,
+    _QueuePolicy,
+)
+from .circuit_breaker import CircuitBreaker
+from .color_transition import ColorTransition, static_target
+from .liveness import LivenessMonitor
+from .metrics import ControllerMetrics
+from .profiler import CallbackProfiler
+from .ring_buffer import RingBuffer
+from .send_pipeline import SendPipeline, SendResult
+from .sync_stats import ClockSyncStats
+from .tracing import ConfirmationTracer
+from .transport import (
+    TCP_PORT,
+    EventStream,
+    NetworkTransport,
+    SimulationTransport,
+    Transport,
+)
 
 _logger = logging.getLogger(__name__)
 
-_HTTP_HEADERS = {
-    "user-agent": "homeassistant-fhem_rgbwwcontroller",
-    "Accept": "application/json",
-    "Content-Type": "application/json",
-}
-
-
 class ControllerUnavailableError(Exception):
     """Custom exception for when the controller is unavailable."""
 
@@ -40,7 +52,7 @@ class RgbwwStateUpdate(Protocol):
     def delme_func(self) -> None: ...
 
 
-@dataclass
+@dataclass(slots=True)
 class _ColorState:
     color_temp: int
     hue: int
@@ -54,7 +66,7 @@ class _ColorState:
     raw_cw: int
 
 
-@dataclass
+@dataclass(slots=True)
 class ControllerColorHsv:
     h: str | None = None
     s: str | None = None
@@ -62,7 +74,7 @@ class ControllerColorHsv:
     ct: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ControllerColorRaw:
     r: str | None = None
     g: str | None = None
@@ -71,7 +83,7 @@ class ControllerColorRaw:
     ww: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ControllerApiColorCommand:
     """Command to be sent to the controller API. Using the exact field names as expected by the API."""
 
@@ -136,57 +148,203 @@ class ControllerApiColorCommand:
         )
 
 
-_SIM_RESPONSES: dict[str, Any] = {
-    "info": {
-        "firmware": "9.0-sim",
-        "heap_free": 21123,
-        "connection": {"mac": "a020a60836aa"},
-        "git_version": "9.00-sim.git",
-        "webapp_version": "1.0-Shojo",
-    },
-    "config": {
-        "network": {"mqtt": {"enabled": True, "server": "mqtthost"}},
-        "color": {"colortemp": {"cw": 5000, "ww": 2700}},
-        "sync": {"cmd_slave_enabled": True},
-    },
-    "color": {
-        "hsv": {"h": 54, "s": 50, "v": 50, "ct": 3000},
-        "rgbww": {"r": 500, "g": 500, "b": 500, "cw": 500, "ww": 500},
-        "mode": "hsv",
-    },
-    "clock_slave_status": {
-        "offset": 0,
-        "current_interval": 50,
-    },
-    "state_completed": {},
+@dataclass(frozen=True, slots=True)
+class PreparedColorCommands:
+    """Color commands converted and serialized once, ready to be sent to any controller."""
+
+    commands: Sequence[ColorCommandHsv | ColorCommandRgbww]
+    cmds: list[dict[str, Any]]
+    payload: dict[str, Any]
+    body: bytes
+    # a "single" first step clears the controller queue, so anything
+    # still waiting to be sent before it would be discarded anyway
+    supersedes: bool
+
+    @classmethod
+    def from_commands(
+        cls, commands: Sequence[ColorCommandHsv | ColorCommandRgbww]
+    ) -> Self:
+        cmds = [
+            ControllerApiColorCommand.from_color_command(x).asdict_compact()
+            for x in commands
+        ]
+        payload = cmds[0] if len(cmds) == 1 else {"cmds": cmds}
+        supersedes = bool(commands) and commands[0].queue_policy in (
+            None,
+            _QueuePolicy.SINGLE,
+        )
+        return cls(commands, cmds, payload, json.dumps(payload).encode(), supersedes)
+
+
+_CHANNEL_NAME_MAP = {
+    "hue": "h",
+    "saturation": "s",
+    "value": "v",
+    "color_temp": "ct",
 }
 
 
+def prepare_channel_command(
+    command: Literal["pause", "continue", "stop"], channels: Sequence[str]
+) -> dict[str, Any]:
+    """Validate a channel command and return its payload, usable for any controller."""
+    if command not in ["pause", "continue", "stop"]:
+        raise ValueError("Invalid command")
+
+    for ch in channels:
+        if ch not in _CHANNEL_NAME_MAP:
+            raise ValueError(f"Invalid channel: {ch}")
+
+    return {"channels": [_CHANNEL_NAME_MAP[ch] for ch in channels]}
+
+
+# The parts of `info` and `config` the integration uses. Everything else is
+# dropped when the controller reports them, the full documents are large and
+# would otherwise be kept for every controller. None keeps the whole value.
+_FieldSpec = dict[str, "_FieldSpec | None"]
+
+_INFO_FIELDS: _FieldSpec = {
+    "git_version": None,
+    "webapp_version": None,
+    "connection": {"mac": None},
+}
+
+# besides the fields read by the entities, the sections that are commonly
+# changed with the update_config service, so unchanged values can be skipped
+_CONFIG_FIELDS: _FieldSpec = {
+    "general": {"device_name": None},
+    "network": {"mqtt": None},
+    "color": {"outputmode": None, "brightness": None, "hsv": None, "colortemp": None},
+    "sync": None,
+}
+
+# the message history keeps the retained fields of these messages only
+_HISTORY_FIELDS: dict[str, _FieldSpec] = {
+    "info": _INFO_FIELDS,
+    "config": _CONFIG_FIELDS,
+}
+
+
+def _retain_fields(data: dict[str, Any], fields: _FieldSpec) -> dict[str, Any]:
+    retained: dict[str, Any] = {}
+    for key, sub_fields in fields.items():
+        if key not in data:
+            continue
+        value = data[key]
+        if sub_fields is not None and isinstance(value, dict):
+            value = _retain_fields(value, sub_fields)
+        retained[key] = value
+    return retained
+
+
+def config_diff(
+    current: dict[str, Any] | None, changes: dict[str, Any]
+) -> dict[str, Any]:
+    """Return the part of `changes` that differs from `current`.
+
+    Sections are compared key by key. Keys missing in `current`, e.g. because
+    they are not retained, count as changed.
+    """
+    diff: dict[str, Any] = {}
+    for key, value in changes.items():
+        if current is None or key not in current:
+            diff[key] = value
+        elif isinstance(value, dict) and isinstance(current[key], dict):
+            if sub_diff := config_diff(current[key], value):
+                diff[key] = sub_diff
+        elif value != current[key]:
+            diff[key] = value
+    return diff
+
+
+def _merge_config(current: dict[str, Any], changes: dict[str, Any]) -> dict[str, Any]:
+    merged = dict(current)
+    for key, value in changes.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            value = _merge_config(merged[key], value)
+        merged[key] = value
+    return merged
+
+
+RefreshItem = Literal["info", "config", "color"]
+
+REFRESH_ITEMS: tuple[RefreshItem, ...] = ("info", "config", "color")
+
+
 class RgbwwController:
     """The actual binding to the controller via network."""
 
-    _TCP_PORT = 9090
     _WATCHDOG_DISCONNECT_TIMEOUT = 70
+    _LIVENESS_PROBE_TIMEOUT = 2
+    _TRANSITION_UPDATE_INTERVAL = 1.0
+    _MESSAGE_HISTORY_SIZE = 50
+    _COMMAND_HISTORY_SIZE = 50
+    _RECONNECT_HISTORY_SIZE = 10
+    # channel values closer than this to the target count as unchanged
+    _UNCHANGED_TOLERANCE = 0.5
+    # parts of the state received more recently are not requested by `refresh`
+    _REFRESH_MAX_AGE = 5.0
 
     def __init__(
-        self, hass: HomeAssistant, host: str, http_request_timeout: int = 20
+        self,
+        hass: HomeAssistant,
+        host: str,
+        http_request_timeout: int = 20,
+        transport: Transport | None = None,
+        profiler: CallbackProfiler | None = None,
     ) -> None:
         self._hass = hass
         self.host = host
+        if transport is None:
+            if os.getenv("SIMULATION"):
+                transport = SimulationTransport()
+            else:
+                transport = NetworkTransport(hass, host)
+        self._transport = transport
         self.connected = False
-        self.color = _ColorState(0, 0, 0, 0, "raw", 0, 0, 0, 0, 0)
+        self._color = _ColorState(0, 0, 0, 0, "raw", 0, 0, 0, 0, 0)
+        self._transition: ColorTransition | None = None
+        self._transition_timer: asyncio.TimerHandle | None = None
         self._connection_task: asyncio.Task[None] | None = None
         self._info_cached: dict[str, Any] | None = None
         self._config_cached: dict[str, Any] | None = None
         self._clock_slave_status_cache: dict[str, Any] | None = None
+        # monotonic time each part of the state was last received
+        self._received_at: dict[RefreshItem, float] = {}
+        self.sync_stats = ClockSyncStats()
 
         self._callbacks: dict[int, RgbwwStateUpdate] = {}
+        self._profiler = profiler
         self._buffer = ""
         self._stop_event = asyncio.Event()
-        self._writer: asyncio.StreamWriter | None = None
+        self._stream: EventStream | None = None
         self.state_completed = False
-        self._simulation = os.getenv("SIMULATION")
         self._http_request_timeout = http_request_timeout
+        self._pipeline = SendPipeline(
+            self._send_http_post, name=f"fhem_rgbwwcontroller_send_{host}"
+        )
+        self.metrics = ControllerMetrics()
+        self.breaker = CircuitBreaker(self._probe_recovery, name=host)
+        self._liveness = LivenessMonitor(self._WATCHDOG_DISCONNECT_TIMEOUT)
+        self.tracer = ConfirmationTracer()
+        self._last_color_event: float | None = None
+        # target of the last submitted command if it was a plain color without
+        # any animation, None if the controller queue may still be busy
+        self._static_target: tuple[str, dict[str, float]] | None = None
+        # animation name -> futures resolved with `requeued` when it finishes
+        self._transition_waiters: dict[str, list[asyncio.Future[bool]]] = {}
+        # (method, params) of the received messages, info and config reduced to
+        # their retained fields
+        self.message_history: RingBuffer[tuple[str, dict[str, Any]]] = RingBuffer(
+            self._MESSAGE_HISTORY_SIZE
+        )
+        # (endpoint, payload, latency in seconds, error or None)
+        self.command_history: RingBuffer[
+            tuple[str, dict[str, Any] | None, float, str | None]
+        ] = RingBuffer(self._COMMAND_HISTORY_SIZE)
+        self.reconnect_history: RingBuffer[str] = RingBuffer(
+            self._RECONNECT_HISTORY_SIZE
+        )
 
     def _consume_json_msg(self) -> dict[str, Any] | None:
         try:
@@ -204,99 +362,99 @@ class RgbwwController:
     async def _run_connection_task(self):
         """Connects to a server and automatically reconnects if the connection is lost."""
         self._buffer = ""
-
-        if self._simulation:
-            try:
-                init = True
-                last_slave_offset = time.monotonic()
-                while not self._stop_event.is_set():
-
-                    def _get_rpc(name: str) -> dict[str, Any]:
-                        method = name
-                        if method == "color":
-                            method = "color_event"
-                        return {"method": method, "params": _SIM_RESPONSES[name]}
-
-                    if init:
-                        await asyncio.sleep(0.3)
-                        self._on_json_message(_get_rpc("info"))
-                        await asyncio.sleep(0.3)
-                        self._on_json_message(_get_rpc("config"))
-                        await asyncio.sleep(0.3)
-                        self._on_json_message(_get_rpc("color"))
-                        self._on_json_message(_get_rpc("state_completed"))
-                        init = False
-                    await asyncio.sleep(1)
-
-                    now = time.monotonic()
-                    if now - last_slave_offset > 5:
-                        last_slave_offset = now
-                        status = _get_rpc("clock_slave_status")
-                        status["params"]["current_interval"] = random.randint(
-                            19000, 21000
-                        )
-                        status["params"]["offset"] = random.randint(-10, 10)
-                        self._on_json_message(status)
-            except Exception as e:
-                # Catch any other unexpected errors
-                _logger.exception("An unexpected error occurred", exc_info=e)
+        connected_before = False
 
         while not self._stop_event.is_set():
             try:
                 # 1. Attempt to connect
                 _logger.info(
-                    "🔌 Attempting to connect to %s:%s...", self.host, self._TCP_PORT
-                )
-                reader, self._writer = await asyncio.open_connection(
-                    self.host, self._TCP_PORT
+                    "🔌 Attempting to connect to %s:%s...", self.host, TCP_PORT
                 )
+                self._stream = stream = await self._transport.open_event_stream()
 
                 # 2. Connection Established Notification
                 # If we reach this line, the connection was successful.
+                if connected_before:
+                    self.metrics.reconnects += 1
+                connected_before = True
                 await self.on_connect_status_change(True)
 
                 # 3. Main loop to read data (your "work" goes here)
+                last_data = time.monotonic()
                 while not self._stop_event.is_set():
                     # For your LED controller, this is where you'd wait for events.
+                    # Wait for a few keep_alive intervals only, then actively probe.
+                    silence = time.monotonic() - last_data
+                    timeout = min(
+                        self._liveness.silence_timeout,
+                        self._WATCHDOG_DISCONNECT_TIMEOUT - silence,
+                    )
                     try:
                         data = await asyncio.wait_for(
-                            reader.read(4096), timeout=self._WATCHDOG_DISCONNECT_TIMEOUT
+                            stream.read(4096), timeout=max(timeout, 0)
                         )  # Read up to 4KB
                     except TimeoutError:
+                        silence = time.monotonic() - last_data
+                        if (
+                            silence < self._WATCHDOG_DISCONNECT_TIMEOUT
+                            and await self._probe_liveness()
+                        ):
+                            continue  # controller is alive, just quiet
+
                         # No data, controller is gone...
+                        self.metrics.watchdog_timeouts += 1
+                        self.reconnect_history.append(
+                            f"keep-alive timeout after {silence:.1f} s"
+                        )
                         _logger.warning(
-                            "🔥 Keep-alive timeout! No data received for %s s.",
-                            self._WATCHDOG_DISCONNECT_TIMEOUT,
+                            "🔥 Keep-alive timeout! No data received for %.1f s.",
+                            silence,
                         )
                         break
 
+                    last_data = time.monotonic()
+
                     if not data:
                         # This indicates the server has closed the connection gracefully.
                         _logger.warning("🚪 Server closed the connection.")
+                        self.reconnect_history.append("server closed connection")
                         break  # Exit the inner loop to trigger reconnection logic.
 
+                    self.metrics.bytes_received += len(data)
                     self._buffer += data.decode("utf-8")
 
                     while (json_msg := self._consume_json_msg()) is not None:
-                        self._on_json_message(json_msg)
+                        if self._profiler is not None and self._profiler.enabled:
+                            self._profiler.call(
+                                f"dispatch.{json_msg['method']}",
+                                self.host,
+                                self._on_json_message,
+                                json_msg,
+                            )
+                        else:
+                            self._on_json_message(json_msg)
                     # -----------------------------
             except (ConnectionResetError, asyncio.IncompleteReadError) as e:
                 # This happens if an established connection is lost mid-communication
                 _logger.warning("💔 Connection lost: %s", str(e))
+                self.reconnect_history.append(f"connection lost: {e}")
 
             except (ConnectionRefusedError, OSError) as e:
                 # This happens if the server is not running or unreachable
                 _logger.warning("❌ Connection failed: %s", str(e))
+                self.reconnect_history.append(f"connection failed: {e}")
 
             except Exception as e:
                 # Catch any other unexpected errors
                 _logger.error("An unexpected error occurred: %s", str(e))
+                self.reconnect_history.append(f"unexpected error: {e}")
 
             finally:
                 # 4. Cleanup before retrying
-                if self._writer:
-                    self._writer.close()
-                    await self._writer.wait_closed()
+                if self._stream:
+                    await self._stream.close()
+                    self._stream = None
+                self._liveness.on_disconnect()
                 await self.on_connect_status_change(False)
 
             reconnect_delay = 10
@@ -305,6 +463,35 @@ class RgbwwController:
             with contextlib.suppress(asyncio.TimeoutError):
                 await asyncio.wait_for(self._stop_event.wait(), reconnect_delay)
 
+    async def _probe_liveness(self) -> bool:
+        """Check with a short HTTP request whether a silent controller is still alive."""
+        self.metrics.liveness_probes += 1
+        try:
+            await self._send_http_get(
+                "info", timeout=self._LIVENESS_PROBE_TIMEOUT, force=True
+            )
+        except ControllerUnavailableError as e:
+            _logger.warning("%s - Liveness probe failed: %s", self.host, e)
+            return False
+        return True
+
+    async def _probe_recovery(self) -> bool:
+        """Check whether the controller is reachable again, bypassing the breaker."""
+        try:
+            await self._send_http_get(
+                "info", timeout=self._LIVENESS_PROBE_TIMEOUT, force=True
+            )
+        except ControllerUnavailableError:
+            return False
+        return True
+
+    def _check_breaker(self, endpoint: str) -> None:
+        if not self.breaker.allow_request():
+            raise ControllerUnavailableError(
+                f"Controller is unreachable (circuit {self.breaker.state}), "
+                f"{endpoint} request not sent"
+            )
+
     def register_callback(self, rcv: RgbwwStateUpdate) -> None:
         """Register a callback object."""
         rcv_id = id(rcv)
@@ -321,13 +508,26 @@ class RgbwwController:
 
         del self._callbacks[rcv_id]
 
+    def _notify(self, method: str, *args: Any) -> None:
+        """Call `method` of all registered callback objects."""
+        profiler = self._profiler
+        if profiler is None or not profiler.enabled:
+            for x in self._callbacks.values():
+                getattr(x, method)(*args)
+            return
+        for x in self._callbacks.values():
+            profiler.call(
+                f"{type(x).__name__}.{method}", self.host, getattr(x, method), *args
+            )
+
     async def on_connect_status_change(self, connected: bool) -> None:
         if connected == self.connected:
             return  # No change
 
         self.connected = connected
-        for x in self._callbacks.values():
-            x.on_connection_update()
+        if not self._stop_event.is_set():
+            self.breaker.on_connection_change(connected)
+        self._notify("on_connection_update")
 
     async def connect(self) -> None:
         """Connect to the controller (including reconnects)."""
@@ -348,106 +548,270 @@ class RgbwwController:
 
         # 1. Signal the loop to not attempt reconnection
         self._stop_event.set()
+        self._clear_transition()
+        self.breaker.stop()
 
         # 2. If there's an active connection, close it to interrupt reader.read()
-        if self._writer:
+        if self._stream:
             _logger.info("Closing active connection...")
-            self._writer.close()
-            await self._writer.wait_closed()
+            await self._stream.close()
 
     async def send_color_command(
         self, color_command: ColorCommandHsv | ColorCommandRgbww
-    ) -> None:
-        await self._send_color(
-            payload=ControllerApiColorCommand.from_color_command(
-                color_command
-            ).asdict_compact()
-        )
+    ) -> SendResult:
+        return await self.send_color_commands([color_command])
 
     async def send_color_commands(
         self, anim_commands: Sequence[ColorCommandHsv | ColorCommandRgbww]
+    ) -> SendResult:
+        return await self.send_prepared(
+            PreparedColorCommands.from_commands(anim_commands)
+        )
+
+    async def send_prepared(
+        self, prepared: PreparedColorCommands, skip_unchanged: bool = True
+    ) -> SendResult:
+        """Send the commands through the ordered pipeline of this controller.
+
+        A single plain color command is skipped if the controller already shows
+        or is about to show that color, unless `skip_unchanged` is False.
+        """
+        target = None
+        if len(prepared.commands) == 1:
+            target = static_target(prepared.commands[0])
+        if skip_unchanged and target is not None and self._is_unchanged(target):
+            self.metrics.commands_skipped += 1
+            return SendResult.SKIPPED
+
+        self._static_target = target
+        started = time.monotonic()
+        self.metrics.commands_sent += 1
+        result = await self._pipeline.submit(
+            "color",
+            prepared.payload,
+            color_cmds=prepared.cmds,
+            supersedes=prepared.supersedes,
+            body=prepared.body,
+        )
+        if prepared.commands and result is not SendResult.SUPERSEDED:
+            # only the first step can start right away, later ones are queued
+            self._on_color_sent(prepared.commands[0], started)
+        return result
+
+    def prepare_restore(self, transition: int = 0) -> PreparedColorCommands:
+        """Prepare the commands that restore the current color.
+
+        `transition` is the fade duration in milliseconds.
+        """
+        color = self.color
+        command: ColorCommandHsv | ColorCommandRgbww
+        if color.color_mode == "hsv":
+            command = ColorCommandHsv(
+                h=color.hue, s=color.saturation, v=color.brightness, ct=color.color_temp
+            )
+        else:
+            command = ColorCommandRgbww(
+                r=color.raw_r,
+                g=color.raw_g,
+                b=color.raw_b,
+                cw=color.raw_cw,
+                ww=color.raw_ww,
+            )
+        command.speed_or_fade_duration = transition
+        return PreparedColorCommands.from_commands([command])
+
+    def _is_unchanged(self, target: tuple[str, dict[str, float]]) -> bool:
+        if self._pipeline.pending:
+            # the last queued command decides the final color
+            return target == self._static_target
+        color = self.color  # also ends a transition that is over
+        if self._static_target is None or self._transition is not None:
+            return False  # an animation or fade may still be running
+
+        color_mode, targets = target
+        if color.color_mode != color_mode:
+            return False
+        for field, value in targets.items():
+            delta = abs(getattr(color, field) - value)
+            if field == "hue":
+                delta = min(delta, 360 - delta)
+            if delta > self._UNCHANGED_TOLERANCE:
+                return False
+        return True
+
+    @property
+    def color(self) -> _ColorState:
+        """Current color, interpolated if a transition started by us is running."""
+        if self._transition is None:
+            return self._color
+
+        now = time.monotonic()
+        if not self._transition.is_running(now):
+            self._transition.apply(self._color, now)
+            self._clear_transition()
+            return self._color
+
+        color = replace(self._color)
+        self._transition.apply(color, now)
+        return color
+
+    def _on_color_sent(
+        self, color_command: ColorCommandHsv | ColorCommandRgbww, started: float
     ) -> None:
-        cmds = {
-            "cmds": [
-                ControllerApiColorCommand.from_color_command(x).asdict_compact()
-                for x in anim_commands
-            ]
-        }
-        await self._send_color(cmds)
+        now = time.monotonic()
+        transition = ColorTransition.from_command(color_command, self.color, now)
+        if transition is None:
+            # queued behind the running animation, nothing changes yet
+            self.tracer.start(started, now, 0.0, None, None)
+            return
+
+        if color_command.anim_name is not None:
+            # the named step is confirmed once its stay time is over
+            self.tracer.start(
+                started,
+                now,
+                transition.duration + (color_command.stay or 0) / 1000,
+                None,
+                color_command.anim_name,
+            )
+        else:
+            self.tracer.start(
+                started,
+                now,
+                transition.duration,
+                transition.targets() or None,
+                None,
+                self._color,
+                self._last_color_event,
+            )
+
+        self._transition = transition
+        if self._transition_timer is None:
+            self._transition_timer = asyncio.get_running_loop().call_later(
+                self._TRANSITION_UPDATE_INTERVAL, self._on_transition_tick
+            )
+
+    def _on_transition_tick(self) -> None:
+        self._transition_timer = None
+        running = self._transition is not None and self._transition.is_running(
+            time.monotonic()
+        )
+
+        self._notify("on_update_color")
+
+        if running:
+            self._transition_timer = asyncio.get_running_loop().call_later(
+                self._TRANSITION_UPDATE_INTERVAL, self._on_transition_tick
+            )
+
+    def _finish_transition(self) -> None:
+        """Freeze the interpolated color as the known state."""
+        if self._transition is not None:
+            self._transition.apply(self._color, time.monotonic())
+        self._clear_transition()
 
-    async def _send_color(self, payload: dict[str, Any]) -> None:
-        await self._send_http_post("color", payload=payload)
+    def _clear_transition(self) -> None:
+        self._transition = None
+        if self._transition_timer is not None:
+            self._transition_timer.cancel()
+            self._transition_timer = None
 
     async def send_channel_command(
         self,
         command: Literal["pause", "continue", "stop"],
         channels: list[str],
     ) -> None:
-        channel_name_map = {
-            "hue": "h",
-            "saturation": "s",
-            "value": "v",
-            "color_temp": "ct",
-        }
-        if command not in ["pause", "continue", "stop"]:
-            raise ValueError("Invalid command")
-
-        for ch in channels:
-            if ch not in channel_name_map:
-                raise ValueError(f"Invalid channel: {ch}")
+        await self.send_prepared_channel_command(
+            command, prepare_channel_command(command, channels)
+        )
 
-        channels = [channel_name_map[ch] for ch in channels]
-        data: dict[str, Any] = {"channels": channels}
+    async def send_prepared_channel_command(
+        self, command: Literal["pause", "continue", "stop"], data: dict[str, Any]
+    ) -> None:
+        """Send a payload built by `prepare_channel_command`."""
+        self.metrics.commands_sent += 1
+        self._static_target = None
+        await self._pipeline.submit(command, data)
 
-        await self._send_http_post(command, data)
+        if command != "continue":
+            self._finish_transition()
 
     def _update_colorstate_from_json(self, json_msg: dict[str, Any]) -> None:
+        color = self._color
         if "hsv" in json_msg:
-            self.color.hue = json_msg["hsv"].get("h", self.color.hue)
-            self.color.saturation = json_msg["hsv"].get("s", self.color.saturation)
-            self.color.color_temp = json_msg["hsv"].get("ct", self.color.color_temp)
-            self.color.brightness = json_msg["hsv"].get("v", self.color.brightness)
+            color.hue = json_msg["hsv"].get("h", color.hue)
+            color.saturation = json_msg["hsv"].get("s", color.saturation)
+            color.color_temp = json_msg["hsv"].get("ct", color.color_temp)
+            color.brightness = json_msg["hsv"].get("v", color.brightness)
 
         if "raw" in json_msg:
-            self.color.raw_ww = json_msg["raw"].get("ww", self.color.raw_ww)
-            self.color.raw_cw = json_msg["raw"].get("cw", self.color.raw_cw)
-            self.color.raw_r = json_msg["raw"].get("r", self.color.raw_r)
-            self.color.raw_g = json_msg["raw"].get("g", self.color.raw_g)
-            self.color.raw_b = json_msg["raw"].get("b", self.color.raw_b)
+            color.raw_ww = json_msg["raw"].get("ww", color.raw_ww)
+            color.raw_cw = json_msg["raw"].get("cw", color.raw_cw)
+            color.raw_r = json_msg["raw"].get("r", color.raw_r)
+            color.raw_g = json_msg["raw"].get("g", color.raw_g)
+            color.raw_b = json_msg["raw"].get("b", color.raw_b)
 
         if "mode" in json_msg:
-            self.color.color_mode = json_msg["mode"]
+            color.color_mode = json_msg["mode"]
+
+        if self._transition is not None:
+            if color.color_mode != self._transition.color_mode:
+                # someone else took over the controller
+                self._clear_transition()
+            else:
+                # the controller state is authoritative, interpolate onwards from it
+                self._transition.rebase(color, time.monotonic())
 
     def _on_json_message(self, json_msg: dict[str, Any]) -> None:
         # ANY data from the server resets the timer.
+        self.metrics.record_event(json_msg["method"])
+        if (fields := _HISTORY_FIELDS.get(json_msg["method"])) is not None:
+            json_msg["params"] = _retain_fields(json_msg["params"], fields)
+        self.message_history.append((json_msg["method"], json_msg.get("params", {})))
         match json_msg["method"]:
             case "color_event":
                 self._update_colorstate_from_json(json_msg["params"])
+                self._last_color_event = self._received_at["color"] = time.monotonic()
+                self.tracer.on_color(self._color, self._last_color_event)
                 _logger.debug("%s - %s", self.host, self.color)
 
-                for x in self._callbacks.values():
-                    x.on_update_color()
+                self._notify("on_update_color")
             case "info":
                 self._info_cached = json_msg["params"]
+                self._received_at["info"] = time.monotonic()
             case "transition_finished":
-                for x in self._callbacks.values():
-                    x.on_transition_finished(
-                        json_msg["params"]["name"], json_msg["params"]["requeued"]
-                    )
+                self.tracer.on_transition_finished(
+                    json_msg["params"]["name"], time.monotonic()
+                )
+                if (
+                    self._transition is not None
+                    and self._transition.name == json_msg["params"]["name"]
+                ):
+                    self._finish_transition()
+                self._resolve_transition_waiters(
+                    json_msg["params"]["name"], json_msg["params"]["requeued"]
+                )
+                self._notify(
+                    "on_transition_finished",
+                    json_msg["params"]["name"],
+                    json_msg["params"]["requeued"],
+                )
             case "config":
                 self._config_cached = json_msg["params"]
-                for x in self._callbacks.values():
-                    x.on_config_update()
+                self._received_at["config"] = time.monotonic()
+                self._notify("on_config_update")
             case "keep_alive":
-                pass
+                self._liveness.on_keep_alive(time.monotonic())
             case "state_completed":
                 self.state_completed = True
-                for x in self._callbacks.values():
-                    x.on_state_completed()
+                self._notify("on_state_completed")
             case "clock_slave_status":
                 self._clock_slave_status_cache = json_msg["params"]
-                for x in self._callbacks.values():
-                    x.on_clock_slave_status_update()
+                self.sync_stats.add(
+                    json_msg["params"]["offset"],
+                    json_msg["params"]["current_interval"],
+                )
+                self._notify("on_clock_slave_status_update")
 
             case "clock_slave_status":
                 ...
@@ -463,21 +827,85 @@ class RgbwwController:
                     json_msg["method"],
                 )
 
-    async def refresh(self) -> None:
-        """Refresh the state by requesting it from the controller."""
-        await self._refresh_info()
-        await self._refresh_config()
-        await self._refresh_color()
+    async def wait_for_transition(self, name: str) -> bool:
+        """Wait until the step named `name` finishes, return whether it was requeued."""
+        future: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+        waiters = self._transition_waiters.setdefault(name, [])
+        waiters.append(future)
+        try:
+            return await future
+        finally:
+            if future in waiters:  # timed out or cancelled
+                waiters.remove(future)
+                if not waiters and self._transition_waiters.get(name) is waiters:
+                    del self._transition_waiters[name]
+
+    def _resolve_transition_waiters(self, name: str, requeued: bool) -> None:
+        for future in self._transition_waiters.pop(name, ()):
+            if not future.done():
+                future.set_result(requeued)
+
+    async def update_config(self, changes: dict[str, Any]) -> dict[str, Any]:
+        """Send the part of the partial config `changes` that differs from the cache.
+
+        Returns what was sent, nothing is sent if the config already matches.
+        """
+        diff = config_diff(self._config_cached, changes)
+        if not diff:
+            return diff
+
+        # in order with the color and channel commands sent before
+        await self._pipeline.submit("config", diff)
+        self._config_cached = _retain_fields(
+            _merge_config(self._config_cached or {}, diff), _CONFIG_FIELDS
+        )
+        self._notify("on_config_update")
+        return diff
+
+    async def refresh(
+        self,
+        items: Collection[RefreshItem] = REFRESH_ITEMS,
+        max_age: float = _REFRESH_MAX_AGE,
+    ) -> None:
+        """Request `items` of the state from the controller concurrently.
+
+        Items received within the last `max_age` seconds, e.g. pushed over the
+        event stream, are not requested again.
+        """
+        now = time.monotonic()
+        fetches = {
+            "info": self._refresh_info,
+            "config": self._refresh_config,
+            "color": self._refresh_color,
+        }
+        results = await asyncio.gather(
+            *(
+                fetches[item]()
+                for item in items
+                if now - self._received_at.get(item, -math.inf) > max_age
+            ),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
 
     async def _refresh_info(self) -> None:
-        self._info_cached = await self._send_http_get("info")
+        self._info_cached = _retain_fields(
+            await self._send_http_get("info"), _INFO_FIELDS
+        )
+        self._received_at["info"] = time.monotonic()
 
     async def _refresh_config(self) -> None:
-        self._config_cached = await self._send_http_get("config")
+        self._config_cached = _retain_fields(
+            await self._send_http_get("config"), _CONFIG_FIELDS
+        )
+        self._received_at["config"] = time.monotonic()
 
     async def _refresh_color(self) -> None:
         json_data = await self._send_http_get("color")
         self._update_colorstate_from_json(json_data)
+        self._received_at["color"] = time.monotonic()
 
     @property
     def info(self) -> dict[str, Any]:
@@ -491,6 +919,20 @@ class RgbwwController:
             raise RuntimeError("Config not loaded yet")
         return self._config_cached
 
+    @property
+    def cached_info(self) -> dict[str, Any] | None:
+        """The retained fields of `info`, None if not loaded yet."""
+        return self._info_cached
+
+    @property
+    def cached_config(self) -> dict[str, Any] | None:
+        """The retained fields of `config`, None if not loaded yet."""
+        return self._config_cached
+
+    @property
+    def keep_alive_interval(self) -> float | None:
+        return self._liveness.keep_alive_interval
+
     @property
     def device_name(self) -> str:
         if self._config_cached is None:
@@ -501,57 +943,62 @@ class RgbwwController:
     def clock_slave_status(self) -> dict[str, Any] | None:
         return self._clock_slave_status_cache
 
-    async def _send_http_post(self, endpoint: str, payload: dict[str, Any]) -> None:
-        if self._simulation:
-            if endpoint == "config":
-                return None
-            raise HomeAssistantError("Endpoint not supported by simulation")
-
-        session = async_get_clientsession(self._hass)
+    async def _send_http_post(
+        self, endpoint: str, payload: dict[str, Any], body: bytes | None = None
+    ) -> Any:
+        """POST `payload` to the controller, `body` is its already serialized form."""
+        self._check_breaker(endpoint)
+        started = time.perf_counter()
+        ok = False
+        error: str | None = None
         try:
             # Use a timeout to prevent the request from hanging indefinitely
             async with asyncio.timeout(self._http_request_timeout):
-                # The actual request using the shared session
-                response = await session.post(
-                    f"http://{self.host}/{endpoint}",
-                    json=payload,
-                    headers=_HTTP_HEADERS,
-                )
-
-                # Raise an exception if the response has an error status (4xx or 5xx)
-                response.raise_for_status()
-
-                return await response.json()
+                result = await self._transport.post(endpoint, payload, body)
+                ok = True
+                self.breaker.record_success()
+                return result
 
         # Handle cases where the device is offline or the connection fails
         except (ClientError, asyncio.TimeoutError) as err:
+            error = repr(err)
+            self._record_breaker_failure(err)
             raise ControllerUnavailableError(
                 f"Failed to connect to controller: {err}"
             ) from err
-
-    async def _send_http_get(self, endpoint: str) -> dict[str, Any]:
-        if self._simulation:
-            if endpoint not in _SIM_RESPONSES:
-                raise HomeAssistantError("Endpoint not supported by simulation")
-            return _SIM_RESPONSES[endpoint]
-
-        session = async_get_clientsession(self._hass)
+        finally:
+            latency = time.perf_counter() - started
+            self.metrics.record_http(endpoint, latency, ok)
+            self.command_history.append((endpoint, payload, latency, error))
+
+    async def _send_http_get(
+        self, endpoint: str, timeout: float | None = None, force: bool = False
+    ) -> dict[str, Any]:
+        """GET `endpoint`, `force` sends it even if the circuit breaker is open."""
+        if not force:
+            self._check_breaker(endpoint)
+        started = time.perf_counter()
+        ok = False
         try:
             # Use a timeout to prevent the request from hanging indefinitely
-            async with asyncio.timeout(self._http_request_timeout):
-                # The actual request using the shared session
-                response = await session.get(
-                    f"http://{self.host}/{endpoint}", headers=_HTTP_HEADERS
-                )
-
-                # Raise an exception if the response has an error status (4xx or 5xx)
-                response.raise_for_status()
-
-                # Return the JSON response
-                return await response.json()
+            async with asyncio.timeout(timeout or self._http_request_timeout):
+                result = await self._transport.get(endpoint)
+                ok = True
+                self.breaker.record_success()
+                return result
 
         # Handle cases where the device is offline or the connection fails
         except (ClientError, asyncio.TimeoutError) as err:
+            self._record_breaker_failure(err)
             raise ControllerUnavailableError(
                 f"Failed to connect to controller: {err}"
             ) from err
+        finally:
+            self.metrics.record_http(endpoint, time.perf_counter() - started, ok)
+
+    def _record_breaker_failure(self, err: Exception) -> None:
+        if isinstance(err, ClientResponseError):
+            # the controller answered with an error status, so it is reachable
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
@@ -0,0 +1,50 @@
+"""Fixed-size history buffers."""
+
+from array import array
+from collections.abc import Iterator
+import time
+from typing import Generic, TypeVar
+
+_T = TypeVar("_T")
+
+
+class RingBuffer(Generic[_T]):
+    """Preallocated ring buffer that keeps the last `size` items with a timestamp.
+
+    Appending overwrites the oldest slot in place, so recording does not allocate.
+    """
+
+    __slots__ = ("_count", "_items", "_pos", "_times")
+
+    def __init__(self, size: int) -> None:
+        if size <= 0:
+            raise ValueError("size must be positive")
+        self._items: list[_T | None] = [None] * size
+        self._times = array("d", bytes(8 * size))
+        self._pos = 0
+        self._count = 0
+
+    def append(self, item: _T) -> None:
+        pos = self._pos
+        self._items[pos] = item
+        self._times[pos] = time.time()
+        self._pos = (pos + 1) % len(self._items)
+        if self._count < len(self._items):
+            self._count += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[tuple[float, _T]]:
+        """Iterate (timestamp, item) pairs from the oldest to the newest."""
+        size = len(self._items)
+        start = (self._pos - self._count) % size
+        for i in range(self._count):
+            idx = (start + i) % size
+            yield self._times[idx], self._items[idx]  # type: ignore[misc]
+
+    def clear(self) -> None:
+        for i in range(len(self._items)):
+            self._items[i] = None
+        self._pos = 0
+        self._count = 0
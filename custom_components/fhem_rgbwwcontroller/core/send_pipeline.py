@@ -0,0 +1,112 @@
+"""Strictly ordered outgoing command pipeline of a single controller."""
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from enum import StrEnum
+import logging
+from typing import Any
+
+_logger = logging.getLogger(__name__)
+
+
+class SendResult(StrEnum):
+    """What happened to a submitted command."""
+
+    SENT = "sent"  # posted on its own or as the first of a merged request
+    MERGED = "merged"  # posted together with the preceding color command
+    SUPERSEDED = "superseded"  # dropped unsent, a later command made it redundant
+    SKIPPED = "skipped"  # not submitted, the controller already shows the target
+
+
+@dataclass(slots=True)
+class _Item:
+    endpoint: str
+    payload: dict[str, Any]
+    # API representation of the color commands, None for all other requests
+    color_cmds: list[dict[str, Any]] | None
+    body: bytes | None
+    future: asyncio.Future[SendResult]
+
+
+class SendPipeline:
+    """Sends the commands of one controller one after another in submission order.
+
+    Color commands waiting in the pipeline are dropped when a later command
+    replaces the controller queue anyway (queue policy "single"), and
+    consecutive color commands are merged into one request. Other requests
+    (channel commands, config) are never reordered, merged or dropped.
+    """
+
+    def __init__(
+        self,
+        post: Callable[[str, dict[str, Any], bytes | None], Awaitable[Any]],
+        name: str,
+    ) -> None:
+        self._post = post
+        self._name = name
+        self._queue: deque[_Item] = deque()
+        self._task: asyncio.Task[None] | None = None
+
+    def submit(
+        self,
+        endpoint: str,
+        payload: dict[str, Any],
+        color_cmds: list[dict[str, Any]] | None = None,
+        supersedes: bool = False,
+        body: bytes | None = None,
+    ) -> asyncio.Future[SendResult]:
+        """Queue a request, the returned future resolves once it has been handled.
+
+        `body` is the serialized `payload`, it is used unless the request is merged.
+        """
+        loop = asyncio.get_running_loop()
+        item = _Item(endpoint, payload, color_cmds, body, loop.create_future())
+
+        if supersedes:
+            while self._queue and self._queue[-1].color_cmds is not None:
+                dropped = self._queue.pop()
+                if not dropped.future.done():
+                    dropped.future.set_result(SendResult.SUPERSEDED)
+
+        self._queue.append(item)
+        if self._task is None:
+            self._task = loop.create_task(self._run(), name=self._name)
+        return item.future
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    async def _run(self) -> None:
+        try:
+            while self._queue:
+                batch = [self._queue.popleft()]
+                if batch[0].color_cmds is not None:
+                    while self._queue and self._queue[0].color_cmds is not None:
+                        batch.append(self._queue.popleft())
+                await self._send(batch)
+        finally:
+            self._task = None
+
+    async def _send(self, batch: list[_Item]) -> None:
+        first = batch[0]
+        if len(batch) == 1:
+            payload, body = first.payload, first.body
+        else:
+            payload = {"cmds": [c for x in batch for c in x.color_cmds or ()]}
+            body = None
+
+        try:
+            await self._post(first.endpoint, payload, body)
+        except Exception as e:  # noqa: BLE001 - handed to the waiting callers
+            for x in batch:
+                if not x.future.done():
+                    x.future.set_exception(e)
+        else:
+            for x in batch:
+                if not x.future.done():
+                    x.future.set_result(
+                        SendResult.SENT if x is first else SendResult.MERGED
+                    )
@@ -0,0 +1,76 @@
+"""Rolling statistics of the clock synchronization reported by the controller."""
+
+from array import array
+import math
+
+
+class ClockSyncStats:
+    """Aggregates `clock_slave_status` messages over a fixed window.
+
+    Samples are stored in preallocated ring buffers, adding one is O(1). The
+    statistics are computed on demand when they are published.
+    """
+
+    __slots__ = ("_count", "_intervals", "_offsets", "_pos", "samples_total")
+
+    def __init__(self, size: int = 60) -> None:
+        if size <= 1:
+            raise ValueError("size must be at least 2")
+        self._offsets = array("d", bytes(8 * size))
+        self._intervals = array("d", bytes(8 * size))
+        self._pos = 0
+        self._count = 0
+        self.samples_total = 0
+
+    def add(self, offset: float, interval: float) -> None:
+        pos = self._pos
+        self._offsets[pos] = offset
+        self._intervals[pos] = interval
+        self._pos = (pos + 1) % len(self._offsets)
+        if self._count < len(self._offsets):
+            self._count += 1
+        self.samples_total += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _window(self, values: array) -> list[float]:
+        """Values of the window from the oldest to the newest."""
+        size = len(values)
+        start = (self._pos - self._count) % size
+        return [values[(start + i) % size] for i in range(self._count)]
+
+    @property
+    def mean_offset(self) -> float | None:
+        if not self._count:
+            return None
+        return math.fsum(self._window(self._offsets)) / self._count
+
+    @property
+    def jitter(self) -> float | None:
+        """Standard deviation of the offset."""
+        if self._count < 2:
+            return None
+        offsets = self._window(self._offsets)
+        mean = math.fsum(offsets) / self._count
+        return math.sqrt(math.fsum((x - mean) ** 2 for x in offsets) / self._count)
+
+    @property
+    def max_abs_offset(self) -> float | None:
+        if not self._count:
+            return None
+        return max(abs(x) for x in self._window(self._offsets))
+
+    @property
+    def mean_interval(self) -> float | None:
+        if not self._count:
+            return None
+        return math.fsum(self._window(self._intervals)) / self._count
+
+    @property
+    def interval_drift(self) -> float | None:
+        """Average change of `current_interval` per sample over the window."""
+        if self._count < 2:
+            return None
+        intervals = self._window(self._intervals)
+        return (intervals[-1] - intervals[0]) / (self._count - 1)
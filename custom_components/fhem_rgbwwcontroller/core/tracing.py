@@ -0,0 +1,140 @@
+"""Command to confirmation latency tracing.
+
+Every command sent by us is correlated with the first event of the controller
+that confirms it: a `color_event` reporting the commanded target color or a
+`transition_finished` for the named step. The measured time is split into the
+HTTP round trip (network) and the remaining time until the controller reports
+the new state (firmware), minus the transition time that was asked for.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+from .metrics import LatencyHistogram
+
+# Maximum deviation between a reported channel value and the commanded target
+_MATCH_TOLERANCE = 1.5
+
+
+@dataclass(slots=True)
+class _PendingTrace:
+    started: float
+    sent: float
+    expected_duration: float
+    targets: dict[str, float] | None
+    name: str | None
+
+
+class ConfirmationTracer:
+    """Correlates outgoing commands with the confirming controller events."""
+
+    MAX_PENDING = 16
+    TIMEOUT = 60.0
+
+    def __init__(self) -> None:
+        self.network = LatencyHistogram()
+        self.firmware = LatencyHistogram()
+        self.total = LatencyHistogram()
+        self.expired = 0
+        self.superseded = 0
+        self._pending: deque[_PendingTrace] = deque(maxlen=self.MAX_PENDING)
+
+    def start(
+        self,
+        started: float,
+        sent: float,
+        expected_duration: float,
+        targets: dict[str, float] | None,
+        name: str | None,
+        color: Any = None,
+        last_color_event: float | None = None,
+    ) -> None:
+        """Start a trace for a command whose HTTP request took `started` to `sent`.
+
+        `color` and `last_color_event` cover a confirmation that was received
+        before the HTTP response.
+        """
+        self.network.record(sent - started)
+        if targets is None and name is None:
+            return  # nothing to wait for
+
+        if targets is not None:
+            # a new immediate color replaces all colors still in flight
+            before = len(self._pending)
+            self._pending = deque(
+                (x for x in self._pending if x.targets is None),
+                maxlen=self.MAX_PENDING,
+            )
+            self.superseded += before - len(self._pending)
+
+        trace = _PendingTrace(started, sent, expected_duration, targets, name)
+        if (
+            targets is not None
+            and color is not None
+            and last_color_event is not None
+            and last_color_event >= started
+            and _matches(color, targets)
+        ):
+            self._record(trace, last_color_event)
+            return
+
+        if len(self._pending) == self.MAX_PENDING:
+            self.expired += 1
+        self._pending.append(trace)
+
+    def on_color(self, color: Any, now: float) -> None:
+        if not self._pending:
+            return
+        self._expire(now)
+        for trace in list(self._pending):
+            if trace.targets is not None and trace.name is None and _matches(
+                color, trace.targets
+            ):
+                self._confirm(trace, now)
+
+    def on_transition_finished(self, name: str, now: float) -> None:
+        if not self._pending:
+            return
+        self._expire(now)
+        for trace in list(self._pending):
+            if trace.name == name:
+                self._confirm(trace, now)
+                break
+
+    def _confirm(self, trace: _PendingTrace, now: float) -> None:
+        self._pending.remove(trace)
+        self._record(trace, now)
+
+    def _record(self, trace: _PendingTrace, now: float) -> None:
+        firmware = max(0.0, now - trace.sent - trace.expected_duration)
+        self.firmware.record(firmware)
+        self.total.record(trace.sent - trace.started + firmware)
+
+    def _expire(self, now: float) -> None:
+        while self._pending and (
+            now - self._pending[0].sent - self._pending[0].expected_duration
+            > self.TIMEOUT
+        ):
+            self._pending.popleft()
+            self.expired += 1
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "network": self.network.summary(),
+            "firmware": self.firmware.summary(),
+            "total": self.total.summary(),
+            "pending": len(self._pending),
+            "expired": self.expired,
+            "superseded": self.superseded,
+        }
+
+
+def _matches(color: Any, targets: dict[str, float]) -> bool:
+    for field, target in targets.items():
+        diff = abs(getattr(color, field) - target)
+        if field == "hue":
+            diff = min(diff, 360 - diff)
+        if diff > _MATCH_TOLERANCE:
+            return False
+    return True
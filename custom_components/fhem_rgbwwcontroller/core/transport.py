@@ -0,0 +1,300 @@
+"""Network access of a controller.
+
+`RgbwwController` talks to the device through a `Transport`: the JSON-RPC
+event stream on TCP port 9090 and the HTTP API. Besides the real network
+there is a simulation (used with the SIMULATION environment variable) and an
+in-memory loopback that lets tests and benchmarks drive any number of
+controllers inside one process.
+
+Transports raise `aiohttp.ClientError` or `TimeoutError` when the controller
+cannot be reached, like the HTTP client does.
+"""
+
+import asyncio
+import contextlib
+import copy
+import json
+import random
+from typing import Any, Protocol
+
+from aiohttp import ClientConnectionError
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .liveness import configure_tcp_keepalive
+
+_HTTP_HEADERS = {
+    "user-agent": "homeassistant-fhem_rgbwwcontroller",
+    "Accept": "application/json",
+    "Content-Type": "application/json",
+}
+
+TCP_PORT = 9090
+
+
+class EventStream(Protocol):
+    async def read(self, n: int) -> bytes:
+        """Return up to `n` bytes, an empty result means the stream was closed."""
+        ...
+
+    async def close(self) -> None: ...
+
+
+class Transport(Protocol):
+    async def open_event_stream(self) -> EventStream: ...
+
+    async def post(
+        self, endpoint: str, payload: dict[str, Any], body: bytes | None
+    ) -> Any:
+        """POST `payload` to the HTTP API, `body` is its serialized form if given."""
+        ...
+
+    async def get(self, endpoint: str) -> dict[str, Any]: ...
+
+
+def _rpc(method: str, params: dict[str, Any]) -> bytes:
+    return json.dumps({"jsonrpc": "2.0", "method": method, "params": params}).encode()
+
+
+def _absolute_value(value: Any) -> int | float | None:
+    """Channel value of a color command, None if it is relative ("+10", "-5")."""
+    if isinstance(value, str):
+        if value.startswith(("+", "-")):
+            return None
+        try:
+            number = float(value)
+        except ValueError:
+            return None
+        return int(number) if number.is_integer() else number
+    return value if isinstance(value, int | float) else None
+
+
+class _TcpEventStream:
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._reader = reader
+        self._writer = writer
+
+    async def read(self, n: int) -> bytes:
+        return await self._reader.read(n)
+
+    async def close(self) -> None:
+        self._writer.close()
+        await self._writer.wait_closed()
+
+
+class NetworkTransport:
+    """The real controller: TCP event stream and HTTP API."""
+
+    def __init__(self, hass: HomeAssistant, host: str) -> None:
+        self._hass = hass
+        self._host = host
+
+    async def open_event_stream(self) -> EventStream:
+        reader, writer = await asyncio.open_connection(self._host, TCP_PORT)
+        configure_tcp_keepalive(writer.get_extra_info("socket"))
+        return _TcpEventStream(reader, writer)
+
+    async def post(
+        self, endpoint: str, payload: dict[str, Any], body: bytes | None
+    ) -> Any:
+        session = async_get_clientsession(self._hass)
+        if body is not None:
+            response = await session.post(
+                f"http://{self._host}/{endpoint}", data=body, headers=_HTTP_HEADERS
+            )
+        else:
+            response = await session.post(
+                f"http://{self._host}/{endpoint}", json=payload, headers=_HTTP_HEADERS
+            )
+        # Raise an exception if the response has an error status (4xx or 5xx)
+        response.raise_for_status()
+        return await response.json()
+
+    async def get(self, endpoint: str) -> dict[str, Any]:
+        session = async_get_clientsession(self._hass)
+        response = await session.get(
+            f"http://{self._host}/{endpoint}", headers=_HTTP_HEADERS
+        )
+        response.raise_for_status()
+        return await response.json()
+
+
+_SIM_RESPONSES: dict[str, Any] = {
+    "info": {
+        "firmware": "9.0-sim",
+        "heap_free": 21123,
+        "connection": {"mac": "a020a60836aa"},
+        "git_version": "9.00-sim.git",
+        "webapp_version": "1.0-Shojo",
+    },
+    "config": {
+        "network": {"mqtt": {"enabled": True, "server": "mqtthost"}},
+        "color": {"colortemp": {"cw": 5000, "ww": 2700}},
+        "sync": {"cmd_slave_enabled": True},
+    },
+    "color": {
+        "hsv": {"h": 54, "s": 50, "v": 50, "ct": 3000},
+        "raw": {"r": 500, "g": 500, "b": 500, "cw": 500, "ww": 500},
+        "mode": "hsv",
+    },
+    "clock_slave_status": {
+        "offset": 0,
+        "current_interval": 50,
+    },
+    "state_completed": {},
+}
+
+
+class _SimulationEventStream:
+    _STATUS_INTERVAL = 5
+
+    def __init__(self) -> None:
+        self._closed = asyncio.Event()
+        self._init = True
+
+    async def read(self, n: int) -> bytes:
+        if self._init:
+            self._init = False
+            await self._sleep(0.9)
+            return b"".join(
+                _rpc(method, _SIM_RESPONSES[name])
+                for name, method in (
+                    ("info", "info"),
+                    ("config", "config"),
+                    ("color", "color_event"),
+                    ("state_completed", "state_completed"),
+                )
+            )
+
+        await self._sleep(self._STATUS_INTERVAL)
+        if self._closed.is_set():
+            return b""
+        status = {
+            "offset": random.randint(-10, 10),
+            "current_interval": random.randint(19000, 21000),
+        }
+        return _rpc("keep_alive", {}) + _rpc("clock_slave_status", status)
+
+    async def _sleep(self, delay: float) -> None:
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(self._closed.wait(), delay)
+
+    async def close(self) -> None:
+        self._closed.set()
+
+
+class SimulationTransport:
+    """A fake controller with static state, for UI development without hardware."""
+
+    async def open_event_stream(self) -> EventStream:
+        return _SimulationEventStream()
+
+    async def post(
+        self, endpoint: str, payload: dict[str, Any], body: bytes | None
+    ) -> Any:
+        return {"success": True}
+
+    async def get(self, endpoint: str) -> dict[str, Any]:
+        if endpoint not in _SIM_RESPONSES:
+            raise ClientConnectionError(
+                f"Endpoint not supported by simulation: {endpoint}"
+            )
+        return _SIM_RESPONSES[endpoint]
+
+
+class _LoopbackEventStream:
+    def __init__(self) -> None:
+        self._queue: asyncio.Queue[bytes] = asyncio.Queue()
+
+    def feed(self, data: bytes) -> None:
+        self._queue.put_nowait(data)
+
+    async def read(self, n: int) -> bytes:
+        # a controller sends one message per packet, so `n` is never exceeded
+        return await self._queue.get()
+
+    async def close(self) -> None:
+        self._queue.put_nowait(b"")
+
+
+class LoopbackTransport:
+    """An in-memory controller that is driven by the caller.
+
+    Events are pushed with `emit`. Color commands posted to it are applied to
+    its state and answered with a `color_event`, like the firmware does at the
+    end of a transition. All requests are recorded in `requests`. While
+    `online` is False, connecting and all requests fail.
+    """
+
+    def __init__(self, state: dict[str, Any] | None = None) -> None:
+        self.state: dict[str, Any] = copy.deepcopy(state or _SIM_RESPONSES)
+        self.requests: list[tuple[str, str, dict[str, Any] | None]] = []
+        self.online = True
+        self._stream: _LoopbackEventStream | None = None
+
+    def emit(self, method: str, params: dict[str, Any]) -> None:
+        """Send an event to the connected controller instance."""
+        if self._stream is not None:
+            self._stream.feed(_rpc(method, params))
+
+    def drop_connection(self) -> None:
+        if self._stream is not None:
+            self._stream.feed(b"")
+            self._stream = None
+
+    def _check_online(self) -> None:
+        if not self.online:
+            raise ClientConnectionError("Loopback controller is offline")
+
+    async def open_event_stream(self) -> EventStream:
+        if not self.online:
+            raise ConnectionRefusedError("Loopback controller is offline")
+        self._stream = _LoopbackEventStream()
+        for name, method in (
+            ("info", "info"),
+            ("config", "config"),
+            ("color", "color_event"),
+        ):
+            self.emit(method, self.state[name])
+        self.emit("state_completed", {})
+        return self._stream
+
+    async def post(
+        self, endpoint: str, payload: dict[str, Any], body: bytes | None
+    ) -> Any:
+        self._check_online()
+        self.requests.append(("POST", endpoint, payload))
+        if endpoint == "config":
+            self._apply_config(self.state["config"], payload)
+        elif endpoint == "color":
+            self._apply_color(payload.get("cmds", [payload]))
+        return {"success": True}
+
+    async def get(self, endpoint: str) -> dict[str, Any]:
+        self._check_online()
+        self.requests.append(("GET", endpoint, None))
+        if endpoint not in self.state:
+            raise ClientConnectionError(f"Unknown endpoint: {endpoint}")
+        return self.state[endpoint]
+
+    def _apply_config(self, config: dict[str, Any], changes: dict[str, Any]) -> None:
+        # partial documents only change the given keys, like the firmware does
+        for key, value in changes.items():
+            if isinstance(value, dict) and isinstance(config.get(key), dict):
+                self._apply_config(config[key], value)
+            else:
+                config[key] = value
+
+    def _apply_color(self, cmds: list[dict[str, Any]]) -> None:
+        # the final color of the last step, relative values are not evaluated
+        color = self.state["color"]
+        for cmd in cmds:
+            mode = "hsv" if "hsv" in cmd else "raw"
+            color["mode"] = mode
+            for channel, value in cmd[mode].items():
+                if (value := _absolute_value(value)) is not None:
+                    color[mode][channel] = value
+        self.emit("color_event", color)
@@ -1,31 +1,34 @@
-from homeassistant.const import (
-    CONF_TYPE,
-    CONF_DEVICE_ID,
-    CONF_DOMAIN,
-)
+from typing import Any
+
 import voluptuous as vol
-from homeassistant.core import CALLBACK_TYPE, HomeAssistant
-from homeassistant.helpers.typing import ConfigType
-from homeassistant.components.homeassistant.triggers import event as event_trigger
-from homeassistant.components.device_automation import DEVICE_TRIGGER_BASE_SCHEMA
-from .const import DOMAIN
 
+from homeassistant.components.device_automation import DEVICE_TRIGGER_BASE_SCHEMA
 from homeassistant.const import (
+    CONF_DEVICE_ID,
+    CONF_DOMAIN,
+    CONF_NAME,
     CONF_PLATFORM,
+    CONF_TYPE,
 )
+from homeassistant.core import CALLBACK_TYPE, HassJob, HomeAssistant, callback
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.trigger import TriggerActionType, TriggerInfo
+from homeassistant.helpers.typing import ConfigType
 
-
+from .const import DOMAIN
+from .transition_events import async_get_transition_listeners
 
 TRIGGER_TYPES = {"transition_finished"}
 
 TRIGGER_SCHEMA = DEVICE_TRIGGER_BASE_SCHEMA.extend(
     {
-        #    vol.Required("type"): "transition_finished",
+        vol.Required(CONF_TYPE): vol.In(TRIGGER_TYPES),
+        # only trigger for this animation name
+        vol.Optional(CONF_NAME): cv.string,
     }
 )
 
 
-
 async def async_get_triggers(hass, device_id):
     """Return a list of supported triggers."""
 
@@ -46,23 +49,39 @@ async def async_get_triggers(hass, device_id):
     return triggers
 
 
+async def async_get_trigger_capabilities(
+    hass: HomeAssistant, config: ConfigType
+) -> dict[str, vol.Schema]:
+    """List the extra fields of the trigger."""
+    return {"extra_fields": vol.Schema({vol.Optional(CONF_NAME): cv.string})}
+
+
 async def async_attach_trigger(
     hass: HomeAssistant,
     config: ConfigType,
-    action: CALLBACK_TYPE,
-    trigger_info: dict,
-):
+    action: TriggerActionType,
+    trigger_info: TriggerInfo,
+) -> CALLBACK_TYPE:
     """Called when a user creates a trigger in the UI."""
-    event_config = event_trigger.TRIGGER_SCHEMA(
-        {
-            event_trigger.CONF_PLATFORM: "event",
-            event_trigger.CONF_EVENT_TYPE: "transition_finished",
-            event_trigger.CONF_EVENT_DATA: {
-                CONF_DEVICE_ID: config[CONF_DEVICE_ID],
-                CONF_TYPE: config[CONF_TYPE],
-            },
+    device_id = config[CONF_DEVICE_ID]
+    job = HassJob(action, f"{DOMAIN} transition_finished trigger {device_id}")
+    trigger_data = trigger_info["trigger_data"]
+
+    @callback
+    def on_transition_finished(name: str, requeued: bool) -> None:
+        payload: dict[str, Any] = {
+            **trigger_data,
+            CONF_PLATFORM: "device",
+            CONF_DOMAIN: DOMAIN,
+            CONF_DEVICE_ID: device_id,
+            CONF_TYPE: config[CONF_TYPE],
+            "name": name,
+            "requeued": requeued,
+            "description": f"transition {name} finished",
         }
-    )
-    return await event_trigger.async_attach_trigger(
-        hass, event_config, action, trigger_info
+        hass.async_run_hass_job(job, {"trigger": payload})
+
+    # called directly by the light of the device, see RgbwwLight.on_transition_finished
+    return async_get_transition_listeners(hass).async_attach(
+        device_id, config.get(CONF_NAME), on_transition_finished
     )
@@ -0,0 +1,87 @@
+"""Diagnostics support for the FHEM RGBWW Controller integration."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from datetime import UTC, datetime
+from typing import Any, cast
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .core.rgbww_controller import RgbwwController
+from .core.ring_buffer import RingBuffer
+
+TO_REDACT = {"password", "ssid", "mac", "api_password"}
+
+
+def _timestamp(ts: float) -> str:
+    return datetime.fromtimestamp(ts, UTC).isoformat()
+
+
+def _dump_history(buffer: RingBuffer[Any]) -> list[dict[str, Any]]:
+    return [{"time": _timestamp(ts), "data": item} for ts, item in buffer]
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    controller = cast(RgbwwController, entry.runtime_data)
+    metrics = controller.metrics
+
+    commands = [
+        {
+            "time": _timestamp(ts),
+            "endpoint": endpoint,
+            "payload": payload,
+            "latency": round(latency, 4),
+            "error": error,
+        }
+        for ts, (endpoint, payload, latency, error) in controller.command_history
+    ]
+
+    return {
+        "entry": {"title": entry.title, "data": dict(entry.data)},
+        "connection": {
+            "connected": controller.connected,
+            "state_completed": controller.state_completed,
+            "seconds_since_last_event": metrics.seconds_since_last_event,
+            "reconnects": metrics.reconnects,
+            "watchdog_timeouts": metrics.watchdog_timeouts,
+            "liveness_probes": metrics.liveness_probes,
+            "keep_alive_interval": controller.keep_alive_interval,
+            "reconnect_reasons": _dump_history(controller.reconnect_history),
+        },
+        "circuit_breaker": {
+            "state": controller.breaker.state,
+            "trips": controller.breaker.trips,
+            "rejected": controller.breaker.rejected,
+        },
+        "info": async_redact_data(controller.cached_info or {}, TO_REDACT),
+        "config": async_redact_data(controller.cached_config or {}, TO_REDACT),
+        "clock_slave_status": controller.clock_slave_status,
+        "color": asdict(controller.color),
+        "metrics": {
+            "commands_sent": metrics.commands_sent,
+            "commands_skipped": metrics.commands_skipped,
+            "http_errors": metrics.http_errors,
+            "bytes_received": metrics.bytes_received,
+            "events": metrics.events,
+            "http_latency": {
+                endpoint: hist.summary()
+                for endpoint, hist in metrics.http_latency.items()
+                if hist.count
+            },
+        },
+        "confirmation_latency": controller.tracer.summary(),
+        "messages": async_redact_data(
+            [
+                {"time": _timestamp(ts), "method": method, "params": params}
+                for ts, (method, params) in controller.message_history
+            ],
+            TO_REDACT,
+        ),
+        "commands": commands,
+    }
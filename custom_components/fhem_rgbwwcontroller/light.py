@@ -1,15 +1,13 @@
 """Light platform for the fhem led controller integration."""
 
-import functools
 import logging
 from typing import Any, cast
 
-import voluptuous as vol
-
 from .rgbww_entity import RgbwwEntity
 from homeassistant.components.light import (
     ATTR_BRIGHTNESS,
     ATTR_COLOR_TEMP_KELVIN,
+    ATTR_EFFECT,
     ATTR_HS_COLOR,
     ATTR_RGBWW_COLOR,
     ATTR_TRANSITION,
@@ -20,239 +18,31 @@ from homeassistant.components.light import (
     LightEntityFeature,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import ATTR_ENTITY_ID
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers import entity_platform
 
 # Import the device class from the component that you want to support
-import homeassistant.helpers.config_validation as cv
 import homeassistant.helpers.device_registry as dr
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
-from homeassistant.util.scaling import (
-    scale_ranged_value_to_int_range,
-    scale_to_ranged_value,
-)
-
-from .const import (
-    ATTR_ANIM_DEFINITION_LIST,
-    ATTR_CH_BLUE,
-    ATTR_CH_CW,
-    ATTR_CH_GREEN,
-    ATTR_CH_RED,
-    ATTR_CH_WW,
-    ATTR_HUE,
-    ATTR_QUEUE_POLICY,
-    ATTR_REQUEUE,
-    ATTR_ANIM_NAME,
-    ATTR_SATURATION,
-    ATTR_STAY,
-    ATTR_TRANSITION_MODE,
-    ATTR_TRANSITION_VALUE,
-    DOMAIN,
-)
-from .core.color_commands import (
-    ChannelsType,
-    ColorCommandHsv,
-    ColorCommandRgbww,
-    parse_color_commands,
+from homeassistant.util.scaling import scale_to_ranged_value
+
+from .const import COMMAND_BATCHER, CONTROLLER_INDEX, DOMAIN
+from .core.color_commands import ColorCommandHsv, ColorCommandRgbww
+from .core.color_engine import (
+    ColorEngine,
+    eight_bit_to_raw,
+    percent_to_8bit,
+    raw_to_8bit,
 )
+from .core.command_batcher import CommandBatcher
+from .core.effects import EFFECT_LIST, get_effect
 from .core.rgbww_controller import ControllerUnavailableError, RgbwwController
-
-SERVICE_ANIMATION_HSV = "animation_hsv"
-SERVICE_ANIMATION_CLI_HSV = "animation_cli_hsv"
-SERVICE_ANIMATION_RGBWW = "animation_rgbww"
-SERVICE_ANIMATION_CLI_RGBWW = "animation_cli_rgbww"
-SERVICE_PAUSE = "PAUSE"
-SERVICE_CONTINUE = "CONTINUE"
-SERVICE_SKIP = "SKIP"
-SERVICE_STOP = "STOP"
-
-_SERVICE_ATTR_ANIM_CLI_COMMAND = "anim_definition_command"
-
+from .optimistic_state import OptimisticState
+from .transition_events import TransitionListeners, async_get_transition_listeners
 
 _logger = logging.getLogger(__name__)
 
 
-def _get_animation_service_base_schema() -> vol.Schema:
-    return vol.Schema(
-        {
-            vol.Optional(ATTR_TRANSITION_MODE, default=None): vol.Maybe(
-                vol.In(["time", "speed"])
-            ),
-            vol.Optional(ATTR_TRANSITION_VALUE, default=None): vol.Maybe(
-                vol.All(vol.Coerce(int), vol.Range(min=0))
-            ),
-            vol.Optional(ATTR_STAY, default=None): vol.Maybe(
-                vol.All(vol.Coerce(int), vol.Range(min=0))
-            ),
-            vol.Optional(ATTR_QUEUE_POLICY, default=None): vol.Maybe(
-                vol.In(["single", "back", "front", "front_reset"])
-            ),
-            vol.Optional(ATTR_REQUEUE, default=None): vol.Maybe(cv.boolean),
-            vol.Optional(ATTR_ANIM_NAME, default=None): vol.Maybe(cv.string),
-        }
-    )
-
-
-def _register_channel_services():
-    async def on_service_channel(light_entity: RgbwwLight, call: ServiceCall) -> None:
-        """Handle the channel service call."""
-        _logger.debug(
-            "Channel service called for entity %s. Channel: %s",
-            light_entity.entity_id,
-            call.service,
-        )
-
-        await light_entity.service_channel(call)
-
-    COMMAND_OPTIONS = ["pause", "stop", "continue"]
-    CHANNEL_OPTIONS = ["hue", "saturation", "value", "color_temp"]
-
-    # Definition des Service-Schemas
-    CONTROL_CHANNEL_SCHEMA = {
-        vol.Required("entity_id"): cv.entity_ids,
-        # Validierung für das 'command'-Feld
-        vol.Required("command"): vol.In(COMMAND_OPTIONS),
-        # Validierung für das 'channels'-Feld
-        # 'cv.ensure_list' stellt sicher, dass der Input eine Liste ist (auch wenn nur ein Element kommt).
-        # Der innere Teil validiert, dass jeder String in der Liste ein gültiger Kanal ist.
-        vol.Required("channels"): cv.ensure_list(vol.In(CHANNEL_OPTIONS)),
-    }
-
-    platform = entity_platform.async_get_current_platform()
-    platform.async_register_entity_service(
-        "control_channel",
-        CONTROL_CHANNEL_SCHEMA,
-        on_service_channel,
-    )
-
-
-def _register_animation_hsv_service():
-    # This schema defines the structure for a single step in the animation sequence.
-    # It corresponds to one object in the 'anim_definition' list.
-    ANIMATION_STEP_SCHEMA = _get_animation_service_base_schema().extend(
-        {
-            vol.Optional(ATTR_HUE, default=None): vol.Maybe(cv.string),
-            vol.Optional(ATTR_SATURATION, default=None): vol.Maybe(cv.string),
-            vol.Optional(ATTR_BRIGHTNESS, default=None): vol.Maybe(cv.string),
-            vol.Optional(ATTR_COLOR_TEMP_KELVIN, default=None): vol.Maybe(cv.string),
-        }
-    )
-
-    # This is the main schema for the 'animation' service call.
-    ANIMATION_SERVICE_SCHEMA = {
-        # Validate that an entity_id is provided, which is standard for services
-        # targeting an entity.
-        vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
-        # Validate the main field 'anim_definition'.
-        vol.Required(ATTR_ANIM_DEFINITION_LIST): vol.All(
-            # 1. Ensure the input is a list.
-            cv.ensure_list,
-            # 2. Apply the ANIMATION_STEP_SCHEMA to each item in the list.
-            [ANIMATION_STEP_SCHEMA],
-            # 3. Ensure the list is not empty, as per your description.
-            vol.Length(min=1),
-        ),
-    }
-
-    async def on_service_animation_hsv(
-        light_entity: RgbwwLight, call: ServiceCall
-    ) -> None:
-        """Handle the animation service call."""
-        _logger.debug("Animation service called for entity %s", light_entity.entity_id)
-
-        await light_entity.service_animation_hsv(call)
-
-    platform = entity_platform.async_get_current_platform()
-    platform.async_register_entity_service(
-        SERVICE_ANIMATION_HSV,
-        ANIMATION_SERVICE_SCHEMA,
-        on_service_animation_hsv,
-    )
-
-    async def on_service_animation_cli_hsv(
-        light_entity: RgbwwLight, call: ServiceCall
-    ) -> None:
-        _logger.debug(
-            "Animation HSV CLI service called for entity %s", light_entity.entity_id
-        )
-
-        await light_entity.service_animation_cli_hsv(call)
-
-    ANIMATION_CLI_SERVICE_SCHEMA = {
-        vol.Required(_SERVICE_ATTR_ANIM_CLI_COMMAND): cv.string
-    }
-
-    platform.async_register_entity_service(
-        SERVICE_ANIMATION_CLI_HSV,
-        ANIMATION_CLI_SERVICE_SCHEMA,
-        on_service_animation_cli_hsv,
-    )
-
-
-def _register_animation_rgbww_service():
-    # This schema defines the structure for a single step in the animation sequence.
-    # It corresponds to one object in the 'anim_definition' list.
-    ANIMATION_STEP_SCHEMA = _get_animation_service_base_schema().extend(
-        {
-            vol.Optional(ATTR_CH_RED, default=None): vol.Maybe(cv.string),
-            vol.Optional(ATTR_CH_GREEN, default=None): vol.Maybe(cv.string),
-            vol.Optional(ATTR_CH_BLUE, default=None): vol.Maybe(cv.string),
-            vol.Optional(ATTR_CH_CW, default=None): vol.Maybe(cv.string),
-            vol.Optional(ATTR_CH_WW, default=None): vol.Maybe(cv.string),
-        }
-    )
-
-    # This is the main schema for the 'animation' service call.
-    ANIMATION_SERVICE_SCHEMA = {
-        # Validate that an entity_id is provided, which is standard for services
-        # targeting an entity.
-        vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
-        # Validate the main field 'anim_definition'.
-        vol.Required(ATTR_ANIM_DEFINITION_LIST): vol.All(
-            cv.ensure_list,
-            [ANIMATION_STEP_SCHEMA],
-            vol.Length(min=1),
-        ),
-    }
-
-    async def on_service_animation_rgbww(
-        light_entity: RgbwwLight, call: ServiceCall
-    ) -> None:
-        """Handle the animation service call."""
-        _logger.debug("Animation service called for entity %s", light_entity.entity_id)
-
-        await light_entity.service_animation_rgbww(call)
-
-    # Register the service to set HSV with advanced options
-    platform = entity_platform.async_get_current_platform()
-    platform.async_register_entity_service(
-        SERVICE_ANIMATION_RGBWW,
-        ANIMATION_SERVICE_SCHEMA,
-        on_service_animation_rgbww,
-    )
-
-    async def on_service_animation_cli_rgbww(
-        light_entity: RgbwwLight, call: ServiceCall
-    ) -> None:
-        _logger.debug(
-            "Animation HSV CLI service called for entity %s", light_entity.entity_id
-        )
-
-        await light_entity.service_animation_cli_rgbww(call)
-
-    ANIMATION_CLI_SERVICE_SCHEMA = {
-        vol.Required(_SERVICE_ATTR_ANIM_CLI_COMMAND): cv.string
-    }
-
-    platform.async_register_entity_service(
-        SERVICE_ANIMATION_CLI_RGBWW,
-        ANIMATION_CLI_SERVICE_SCHEMA,
-        on_service_animation_cli_rgbww,
-    )
-
-
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -268,16 +58,15 @@ async def async_setup_entry(
 
     async_add_entities((rgb,))
 
-    _register_animation_hsv_service()
-    _register_animation_rgbww_service()
-    _register_channel_services()
-
 
 class RgbwwLight(RgbwwEntity, LightEntity):
     _attr_has_entity_name = True
     _attr_name = None
     _attr_should_poll = False
 
+    # rewritten by every color event, derived from the recorded state anyway
+    _unrecorded_attributes = frozenset({"hsv_ct", "output_rgbww"})
+
     _attr_max_color_temp_kelvin = DEFAULT_MAX_KELVIN
     _attr_min_color_temp_kelvin = DEFAULT_MIN_KELVIN
 
@@ -301,21 +90,33 @@ class RgbwwLight(RgbwwEntity, LightEntity):
             ColorMode.COLOR_TEMP,
         }
         self._attr_supported_features = (
-            LightEntityFeature.TRANSITION | LightEntityFeature.FLASH
-            # | LightEntityFeature.EFFECT
+            LightEntityFeature.TRANSITION
+            | LightEntityFeature.FLASH
+            | LightEntityFeature.EFFECT
         )
+        self._attr_effect_list = EFFECT_LIST
+        self._attr_effect = None
 
         # Initialize the attributes dictionary
         self._attr_extra_state_attributes = {}
+        self._optimistic = OptimisticState(self)
+        self._color_engine = ColorEngine()
+        self._batcher: CommandBatcher = hass.data[DOMAIN][COMMAND_BATCHER]
+        self._transition_listeners: TransitionListeners = (
+            async_get_transition_listeners(hass)
+        )
 
     async def async_added_to_hass(self) -> None:
         """Subscribe to the events."""
         await super().async_added_to_hass()
+        # services dispatch via entity id, see services.py
+        self.hass.data[DOMAIN][CONTROLLER_INDEX][self.entity_id] = self._controller
 
         if self._controller.state_completed:
             self.on_state_completed()
 
     async def async_will_remove_from_hass(self) -> None:
+        self.hass.data[DOMAIN][CONTROLLER_INDEX].pop(self.entity_id, None)
         await super().async_will_remove_from_hass()
 
     def on_clock_slave_status_update(self) -> None: ...  # noqa: D102
@@ -323,48 +124,50 @@ class RgbwwLight(RgbwwEntity, LightEntity):
     def on_update_color(self) -> None:  # noqa: D102
         if not self._controller.state_completed:
             return
+        if self._optimistic.in_flight:
+            return  # stale, the optimistic target is shown until the command is sent
 
-        match self._controller.color.color_mode:
+        color = self._controller.color
+        match color.color_mode:
             case "raw":
-                raw_conv = functools.partial(
-                    scale_ranged_value_to_int_range, (0, 1023), (0, 255)
-                )
-
                 self._attr_rgbww_color = (
-                    raw_conv(self._controller.color.raw_r),
-                    raw_conv(self._controller.color.raw_g),
-                    raw_conv(self._controller.color.raw_b),
-                    raw_conv(self._controller.color.raw_cw),
-                    raw_conv(self._controller.color.raw_ww),
+                    raw_to_8bit(color.raw_r),
+                    raw_to_8bit(color.raw_g),
+                    raw_to_8bit(color.raw_b),
+                    raw_to_8bit(color.raw_cw),
+                    raw_to_8bit(color.raw_ww),
+                )
+                self._attr_extra_state_attributes["output_rgbww"] = (
+                    self._attr_rgbww_color
                 )
                 self._attr_is_on = (
-                    self._controller.color.raw_r > 0
-                    or self._controller.color.raw_g > 0
-                    or self._controller.color.raw_b > 0
-                    or self._controller.color.raw_ww > 0
-                    or self._controller.color.raw_cw > 0
+                    color.raw_r > 0
+                    or color.raw_g > 0
+                    or color.raw_b > 0
+                    or color.raw_ww > 0
+                    or color.raw_cw > 0
                 )
                 # self._attr_color_mode = ColorMode.RGBWW
             case "hsv":
-                self._attr_hs_color = (
-                    self._controller.color.hue,
-                    self._controller.color.saturation,
-                )
+                self._attr_hs_color = (color.hue, color.saturation)
 
-                v = self._controller.color.brightness
+                v = color.brightness
                 if v is not None:
-                    self._attr_brightness = scale_ranged_value_to_int_range(
-                        (0, 100), (0, 255), v
+                    self._attr_brightness = percent_to_8bit(v)
+                self._attr_extra_state_attributes["hsv_ct"] = color.color_temp
+                # what the controller actually drives on its channels
+                self._attr_extra_state_attributes["output_rgbww"] = (
+                    self._color_engine.hsv_to_rgbww(
+                        color.hue, color.saturation, v, color.color_temp
                     )
-                self._attr_extra_state_attributes["hsv_ct"] = (
-                    self._controller.color.color_temp
                 )
                 self._attr_is_on = v > 0
-                # self._attr_color_temp_kelvin = self._controller.color.color_temp
+                # self._attr_color_temp_kelvin = color.color_temp
                 # self._attr_color_mode = ColorMode.HS
             case _:
                 ...
         self._attr_color_mode = ColorMode.HS
+        self._optimistic.reconcile()
         self.async_write_ha_state()
 
     def _update_ha_device(self) -> None:
@@ -404,194 +207,122 @@ class RgbwwLight(RgbwwEntity, LightEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the entity on."""
-        try:
-            attr_changed = False
-            hsv_params: dict[str, Any] = {"speed_or_fade_duration": 500}
-
-            if (rgbww := kwargs.get(ATTR_RGBWW_COLOR)) is not None:
-                raw_conv = functools.partial(
-                    scale_ranged_value_to_int_range, (0, 255), (0, 1023)
-                )
+        if (effect := kwargs.get(ATTR_EFFECT)) is not None:
+            await self._turn_on_effect(effect, kwargs.get(ATTR_BRIGHTNESS))
+            return
 
-                ctrl_raw = (
-                    raw_conv(rgbww[0]),
-                    raw_conv(rgbww[1]),
-                    raw_conv(rgbww[2]),
-                    raw_conv(rgbww[3]),
-                    raw_conv(rgbww[4]),
-                )
-                await self._controller.set_raw(*ctrl_raw)
-                self._attr_rgbww_color = rgbww
-                attr_changed = True
-                self._attr_color_mode = ColorMode.RGBWW
-                self._attr_is_on = any(c > 0 for c in rgbww)
-            elif (hs := kwargs.get(ATTR_HS_COLOR)) is not None:
-                hsv_params = {"h": hs[0], "s": hs[1]}
-                self._attr_hs_color = hs
-                # self._attr_color_mode = ColorMode.RGBWW
+        target: dict[str, Any] = {"effect": None}
+        duration = 500
+        if (transition := kwargs.get(ATTR_TRANSITION)) is not None:
+            duration = int(transition * 1000)  # seconds to milliseconds
+
+        command: ColorCommandHsv | ColorCommandRgbww
+        if (rgbww := kwargs.get(ATTR_RGBWW_COLOR)) is not None:
+            command = ColorCommandRgbww(
+                speed_or_fade_duration=duration,
+                r=eight_bit_to_raw(rgbww[0]),
+                g=eight_bit_to_raw(rgbww[1]),
+                b=eight_bit_to_raw(rgbww[2]),
+                cw=eight_bit_to_raw(rgbww[3]),
+                ww=eight_bit_to_raw(rgbww[4]),
+            )
+            target["rgbww_color"] = rgbww
+            target["color_mode"] = ColorMode.RGBWW
+            target["is_on"] = any(c > 0 for c in rgbww)
+        else:
+            command = ColorCommandHsv(speed_or_fade_duration=duration)
+            if (hs := kwargs.get(ATTR_HS_COLOR)) is not None:
+                command.h, command.s = hs
+                target["hs_color"] = hs
             if (ct := kwargs.get(ATTR_COLOR_TEMP_KELVIN)) is not None:
-                hsv_params["ct"] = ct
-                self._attr_color_temp_kelvin = ct
                 # we do not actually switch to color temp mode because we use it as a feature for hsv
-                # self._attr_color_mode = ColorMode.COLOR_TEMP
-
-            if not kwargs:  # Turn on with last known state or default
-                await self._controller.send_color_command(ColorCommandHsv(v=100))
-
+                command.ct = ct
+                target["color_temp_kelvin"] = ct
             if (brightness := kwargs.get(ATTR_BRIGHTNESS)) is not None:
-                hsv_params["v"] = scale_to_ranged_value((0, 255), (0, 100), brightness)
-                self._attr_brightness = brightness
-                self._attr_is_on = brightness > 0
-            if (transition := kwargs.get(ATTR_TRANSITION)) is not None:
-                hsv_params["speed_or_fade_duration"] = int(
-                    transition * 1000
-                )  # seconds to milliseconds
-
-        except ControllerUnavailableError as e:
-            _logger.error("async_turn_on failed. Controller error: %s", e)
-        else:
-            if hsv_params:
-                await self._controller.send_color_command(ColorCommandHsv(**hsv_params))
-                attr_changed = True
+                command.v = scale_to_ranged_value((0, 255), (0, 100), brightness)
+                target["brightness"] = brightness
+                target["is_on"] = brightness > 0
+            elif not kwargs:  # Turn on with last known state or default
+                command.v = 100
+                target["brightness"] = 255
+                target["is_on"] = True
 
-            if attr_changed:
-                self.async_write_ha_state()
+        await self._send_optimistic(command, target)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the entity off."""
-        await self._controller.send_color_command(ColorCommandHsv(v=0))
-
-    def on_transition_finished(self, name: str, requeued: bool) -> None:
-        event_data: dict[str, Any] = {
-            "device_id": "rgbwwid",
-            "type": "transition_finished",
-            "name": name,
-            "requeued": requeued,
-        }
-        self.hass.bus.async_fire("transition_finished", event_data)
+        command = ColorCommandHsv(v=0)
+        if (transition := kwargs.get(ATTR_TRANSITION)) is not None:
+            command.speed_or_fade_duration = int(transition * 1000)
 
-    def on_config_update(self) -> None:
-        if not self._controller.state_completed:
-            return
+        await self._send_optimistic(command, {"is_on": False, "effect": None})
 
-        self._attr_max_color_temp_kelvin = self._controller.config["color"][
-            "colortemp"
-        ]["cw"]
-        self._attr_min_color_temp_kelvin = self._controller.config["color"][
-            "colortemp"
-        ]["ww"]
-        self.async_write_ha_state()
+    async def _turn_on_effect(self, effect: str, brightness: int | None) -> None:
+        if effect not in EFFECT_LIST:
+            raise HomeAssistantError(f"Unknown effect: {effect}")
+        if brightness is None:
+            brightness = self.brightness or 255
 
-    async def service_animation_cli_hsv(self, call: ServiceCall) -> None:
+        # effects are prebuilt, starting one is a single POST without any conversion
+        prepared = get_effect(effect, round(brightness * 100 / 255))
+        target = {"effect": effect, "is_on": True, "brightness": brightness}
         try:
-            anims = parse_color_commands(
-                call.data[_SERVICE_ATTR_ANIM_CLI_COMMAND], ChannelsType.HSV
-            )
-            await self._controller.send_color_commands(anims)
+            async with self._optimistic.command(**target):
+                await self._batcher.send_prepared(self._controller, prepared)
         except ControllerUnavailableError as e:
-            # Catch specific errors from your controller library
             _logger.error(
-                "Animation failed: Device at %s is unavailable. Error: %s",
-                self._controller.host,  # Assuming controller has an IP property
+                "Effect failed: Device at %s is unavailable. Error: %s",
+                self._controller.host,
                 e,
             )
-            # Optionally, re-raise as a HA error to notify the user in the UI
             raise HomeAssistantError(
-                f"Failed to start animation: {self.name} is unavailable."
+                f"Failed to start effect: {self.name} is unavailable."
             ) from e
 
-    async def service_animation_hsv(self, call: ServiceCall) -> None:
+    async def _send_optimistic(
+        self, command: ColorCommandHsv | ColorCommandRgbww, target: dict[str, Any]
+    ) -> None:
         try:
-            color_commands = [
-                ColorCommandHsv.from_service(cmd)
-                for cmd in call.data[ATTR_ANIM_DEFINITION_LIST]
-            ]
-            await self._controller.send_color_commands(color_commands)
+            async with self._optimistic.command(**target):
+                await self._batcher.send(
+                    self._controller,
+                    ("turn_on", command.dedupe_key()),
+                    lambda: [command],
+                )
         except ControllerUnavailableError as e:
-            # Catch specific errors from your controller library
             _logger.error(
-                "Animation failed: Device at %s is unavailable. Error: %s",
-                self._controller.host,  # Assuming controller has an IP property
-                e,
-            )
-            # Optionally, re-raise as a HA error to notify the user in the UI
-            raise HomeAssistantError(
-                f"Failed to start animation: {self.name} is unavailable."
-            ) from e
-        except Exception as e:
-            _logger.error(
-                "Animation failed: Error: %s",
+                "Command failed: Device at %s is unavailable. Error: %s",
                 self._controller.host,
                 e,
             )
-            raise HomeAssistantError(f"Failed to start animation. Error: {e}") from e
-
-    async def service_animation_cli_rgbww(self, call: ServiceCall) -> None:
-        try:
-            anims = parse_color_commands(
-                call.data[_SERVICE_ATTR_ANIM_CLI_COMMAND], ChannelsType.RGBWW
-            )
-            await self._controller.send_color_commands(anims)
-        except ControllerUnavailableError as e:
-            # Catch specific errors from your controller library
-            _logger.error(
-                "Animation failed: Device at %s is unavailable. Error: %s",
-                self._controller.host,  # Assuming controller has an IP property
-                e,
-            )
-            # Optionally, re-raise as a HA error to notify the user in the UI
             raise HomeAssistantError(
-                f"Failed to start animation: {self.name} is unavailable."
+                f"Failed to send command: {self.name} is unavailable."
             ) from e
 
-    async def service_animation_rgbww(self, call: ServiceCall) -> None:
-        try:
-            color_commands = [
-                ColorCommandRgbww.from_service(cmd)
-                for cmd in call.data[ATTR_ANIM_DEFINITION_LIST]
-            ]
-            await self._controller.send_color_commands(color_commands)
-        except ControllerUnavailableError as e:
-            # Catch specific errors from your controller library
-            _logger.error(
-                "Animation failed: Device at %s is unavailable. Error: %s",
-                self._controller.host,  # Assuming controller has an IP property
-                e,
-            )
-            # Optionally, re-raise as a HA error to notify the user in the UI
-            raise HomeAssistantError(
-                f"Failed to start animation: {self.name} is unavailable."
-            ) from e
-        except Exception as e:
-            _logger.error(
-                "Animation failed: Error: %s",
-                self._controller.host,
-                e,
-            )
-            raise HomeAssistantError(f"Failed to start animation. Error: {e}") from e
+    def on_transition_finished(self, name: str, requeued: bool) -> None:
+        if self.registry_entry is None or self.registry_entry.device_id is None:
+            return
+        device_id = self.registry_entry.device_id
 
-    async def service_channel(self, call: ServiceCall) -> None:
-        try:
-            await self._controller.send_channel_command(
-                call.data["command"],
-                call.data["channels"],
-            )
+        # device triggers are called directly, the bus event is for everything else
+        self._transition_listeners.async_dispatch(device_id, name, requeued)
+        event_data: dict[str, Any] = {
+            "device_id": device_id,
+            "type": "transition_finished",
+            "name": name,
+            "requeued": requeued,
+        }
+        self.hass.bus.async_fire("transition_finished", event_data)
 
-        except ControllerUnavailableError as e:
-            # Catch specific errors from your controller library
-            _logger.error(
-                "Channel command failed: Device at %s is unavailable. Error: %s",
-                self._controller.host,  # Assuming controller has an IP property
-                e,
-            )
-            # Optionally, re-raise as a HA error to notify the user in the UI
-            raise HomeAssistantError(
-                f"Failed to send channel command: {self.name} is unavailable."
-            ) from e
-        except Exception as e:
-            _logger.error(
-                "Animation failed: Error: %s",
-                self._controller.host,
-                e,
-            )
-            raise HomeAssistantError(f"Failed to start animation. Error: {e}") from e
+    def on_config_update(self) -> None:
+        if not self._controller.state_completed:
+            return
+
+        self._attr_max_color_temp_kelvin = self._controller.config["color"][
+            "colortemp"
+        ]["cw"]
+        self._attr_min_color_temp_kelvin = self._controller.config["color"][
+            "colortemp"
+        ]["ww"]
+        self._color_engine = ColorEngine.from_config(self._controller.config)
+        self.async_write_ha_state()
@@ -0,0 +1,70 @@
+"""Optimistic state handling for light entities."""
+
+from collections.abc import AsyncIterator
+import contextlib
+from typing import Any
+
+from homeassistant.components.light import LightEntity
+
+from .core.rgbww_controller import ControllerUnavailableError
+
+# Entity attributes that are set optimistically and restored on failure
+_LIGHT_ATTRS = (
+    "_attr_is_on",
+    "_attr_brightness",
+    "_attr_hs_color",
+    "_attr_color_temp_kelvin",
+    "_attr_rgbww_color",
+    "_attr_color_mode",
+    "_attr_effect",
+)
+
+
+class OptimisticState:
+    """Shows the intended state of a light before the controller confirmed it.
+
+    The target is written to the entity immediately. Color events that arrive
+    while a command is in flight are stale and should be ignored; the first one
+    after it reconciles the entity with the real device state. If the command
+    fails, the previous state is restored and the entity is flagged as assumed
+    until the controller reports its state again.
+    """
+
+    def __init__(self, entity: LightEntity) -> None:
+        self._entity = entity
+        self._in_flight = 0
+        self._rollback: dict[str, Any] | None = None
+
+    @property
+    def in_flight(self) -> bool:
+        return self._in_flight > 0
+
+    @contextlib.asynccontextmanager
+    async def command(self, **target: Any) -> AsyncIterator[None]:
+        """Apply `target` (attribute names without `_attr_`) while the command runs."""
+        entity = self._entity
+        if self._in_flight == 0:
+            self._rollback = {a: getattr(entity, a, None) for a in _LIGHT_ATTRS}
+        self._in_flight += 1
+
+        for name, value in target.items():
+            setattr(entity, f"_attr_{name}", value)
+        entity.async_write_ha_state()
+
+        try:
+            yield
+        except ControllerUnavailableError:
+            if self._in_flight == 1 and self._rollback is not None:
+                for name, value in self._rollback.items():
+                    setattr(entity, name, value)
+                entity._attr_assumed_state = True  # noqa: SLF001
+                entity.async_write_ha_state()
+            raise
+        finally:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._rollback = None
+
+    def reconcile(self) -> None:
+        """The entity has just been updated from a controller event."""
+        self._entity._attr_assumed_state = False  # noqa: SLF001
@@ -2,24 +2,41 @@
 
 from __future__ import annotations
 
-from datetime import timedelta
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 import logging
-from typing import cast
+import time
+from typing import Any, cast
 
 import voluptuous as vol
 
+from .const import CONF_SENSOR_DEADBAND, CONF_SENSOR_MIN_INTERVAL
+from .core.metrics import LatencyHistogram
 from .core.rgbww_controller import (
     RgbwwController,
 )
 from .rgbww_entity import RgbwwEntity
 from homeassistant.components.sensor import (
     PLATFORM_SCHEMA as SENSOR_PLATFORM_SCHEMA,
+    SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    MATCH_ALL,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import StateType
+from homeassistant.util import dt as dt_util
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,6 +44,9 @@ CONF_METER_NUMBER = "meter_number"
 
 SCAN_INTERVAL = timedelta(minutes=15)
 
+METRICS_UPDATE_INTERVAL = timedelta(seconds=60)
+SYNC_PUBLISH_INTERVAL = timedelta(seconds=30)
+
 PLATFORM_SCHEMA = SENSOR_PLATFORM_SCHEMA.extend(
     {vol.Required(CONF_METER_NUMBER): cv.string}
 )
@@ -39,37 +59,114 @@ async def async_setup_entry(
 ) -> None:
     controller = cast(RgbwwController, entry.runtime_data)
 
-    sync_offset = SyncOffsetSensor(hass, controller, entry)
+    sync_sensors = [
+        SyncOffsetSensor(hass, controller, entry, description)
+        for description in SYNC_SENSORS
+    ]
+    metric_sensors = [
+        ControllerMetricSensor(hass, controller, entry, description)
+        for description in METRIC_SENSORS
+    ]
+
+    async_add_entities((*sync_sensors, *metric_sensors))
+
 
-    async_add_entities((sync_offset,))
+class _RecordingFilter:
+    """Decides whether a new sensor value is worth a state write.
+
+    Every state write ends up in the recorder database. A value is only
+    written if it differs from the last written one by at least `deadband`
+    and `min_interval` seconds have passed since that write.
+    """
+
+    __slots__ = ("_last_time", "_last_value", "deadband", "min_interval")
+
+    def __init__(self, deadband: float, min_interval: float) -> None:
+        self.deadband = deadband
+        self.min_interval = min_interval
+        self._last_value: StateType = None
+        self._last_time: float | None = None
+
+    @classmethod
+    def for_entry(
+        cls, entry: ConfigEntry, description: RgbwwSensorEntityDescription
+    ) -> _RecordingFilter:
+        """Use the description defaults unless overridden in the entry options."""
+        deadband = entry.options.get(CONF_SENSOR_DEADBAND, {}).get(
+            description.key, description.deadband
+        )
+        min_interval = entry.options.get(CONF_SENSOR_MIN_INTERVAL, {}).get(
+            description.key, description.min_interval.total_seconds()
+        )
+        return cls(deadband, min_interval)
+
+    def should_write(self, value: StateType, now: float) -> bool:
+        last = self._last_value
+        if self._last_time is not None:
+            if now - self._last_time < self.min_interval:
+                return False
+            if isinstance(value, int | float) and isinstance(last, int | float):
+                if abs(value - last) < self.deadband:
+                    return False
+            elif value == last:
+                return False
+
+        self._last_value, self._last_time = value, now
+        return True
 
 
 class SyncOffsetSensor(RgbwwEntity, SensorEntity):
-    # _attr_device_class = SensorDeviceClass.
+    """Clock synchronization quality, published from a rolling window."""
+
+    entity_description: RgbwwSensorEntityDescription
+
+    _attr_should_poll = False
 
     def __init__(
         self,
         hass: HomeAssistant,
         controller: RgbwwController,
         config_entry: ConfigEntry,
+        description: RgbwwSensorEntityDescription,
     ):
         """Initialize the sensor."""
         super().__init__(
             hass=hass, controller=controller, device_id=config_entry.unique_id
         )
+        self.entity_description = description
 
-        self._attr_name = config_entry.title + " SyncOffet"
-        self._attr_unique_id = f"{config_entry.unique_id}_syncoffset"
-        self._attr_native_unit_of_measurement = "sync cycles"
+        self._attr_name = f"{config_entry.title} {description.name}"
+        self._attr_unique_id = f"{config_entry.unique_id}_{description.key}"
+        self._published_samples = 0
+        self._filter = _RecordingFilter.for_entry(config_entry, description)
 
     async def async_added_to_hass(self) -> None:
         """Subscribe to the events."""
         self._controller.register_callback(self)
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass, self._async_publish, SYNC_PUBLISH_INTERVAL
+            )
+        )
 
     async def async_will_remove_from_hass(self) -> None:
         """Unsubscribe from the events."""
         await super().async_will_remove_from_hass()
 
+    @callback
+    def _async_publish(self, now: datetime | None) -> None:
+        stats = self._controller.sync_stats
+        if stats.samples_total == self._published_samples:
+            return  # nothing new since the last write
+
+        self._published_samples = stats.samples_total
+        value = self.entity_description.value_fn(self._controller)
+        if not self._filter.should_write(value, time.monotonic()):
+            return
+
+        self._attr_native_value = value
+        self.async_write_ha_state()
+
     def on_update_color(self) -> None: ...
     def on_connection_update(self) -> None: ...
     def on_transition_finished(self, name: str, requeued: bool) -> None: ...
@@ -82,6 +179,236 @@ class SyncOffsetSensor(RgbwwEntity, SensorEntity):
         self._attr_available = True
 
     def on_clock_slave_status_update(self) -> None:
-        self._attr_native_value = self._controller.clock_slave_status["offset"]
-        # clockCurrentInterval
+        # publish the first sample right away, the following ones are aggregated
+        if self._published_samples == 0:
+            self._async_publish(None)
+
+
+def _rounded(value: float | None, digits: int = 3) -> float | None:
+    return None if value is None else round(value, digits)
+
+
+def _histogram_attributes(hist: LatencyHistogram) -> dict[str, Any]:
+    return {k: _rounded(v) for k, v in hist.summary().items()}
+
+
+def _http_latency_attributes(controller: RgbwwController) -> dict[str, Any]:
+    metrics = controller.metrics
+    attrs: dict[str, Any] = {
+        endpoint: _histogram_attributes(hist)
+        for endpoint, hist in metrics.http_latency.items()
+        if hist.count
+    }
+    attrs["errors"] = metrics.http_errors
+    return attrs
+
+
+def _confirmation_latency_attributes(controller: RgbwwController) -> dict[str, Any]:
+    tracer = controller.tracer
+    return {
+        "network": _histogram_attributes(tracer.network),
+        "firmware": _histogram_attributes(tracer.firmware),
+        "total": _histogram_attributes(tracer.total),
+        "expired": tracer.expired,
+        "superseded": tracer.superseded,
+    }
+
+
+@dataclass(frozen=True, kw_only=True)
+class RgbwwSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor exposing a value computed from the controller."""
+
+    value_fn: Callable[[RgbwwController], StateType]
+    attributes_fn: Callable[[RgbwwController], dict[str, Any]] | None = None
+    # report the change per minute instead of the raw counter value
+    per_minute: bool = False
+    # smallest change and time between two recorded values, see _RecordingFilter
+    deadband: float = 0
+    min_interval: timedelta = timedelta(0)
+
+
+METRIC_SENSORS: tuple[RgbwwSensorEntityDescription, ...] = (
+    RgbwwSensorEntityDescription(
+        key="http_latency",
+        name="HTTP latency p95",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=3,
+        value_fn=lambda c: _rounded(c.metrics.http_latency_total.percentile(0.95)),
+        attributes_fn=_http_latency_attributes,
+        deadband=0.005,
+    ),
+    RgbwwSensorEntityDescription(
+        key="confirmation_latency",
+        name="Command confirmation latency p95",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=3,
+        value_fn=lambda c: _rounded(c.tracer.total.percentile(0.95)),
+        attributes_fn=_confirmation_latency_attributes,
+        deadband=0.005,
+    ),
+    RgbwwSensorEntityDescription(
+        key="command_rate",
+        name="Command throughput",
+        native_unit_of_measurement="commands/min",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda c: c.metrics.commands_sent,
+        attributes_fn=lambda c: {"skipped": c.metrics.commands_skipped},
+        per_minute=True,
+        deadband=1,
+    ),
+    RgbwwSensorEntityDescription(
+        key="event_rate",
+        name="Event rate",
+        native_unit_of_measurement="events/min",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda c: c.metrics.events_total,
+        attributes_fn=lambda c: c.metrics.events,
+        per_minute=True,
+        deadband=1,
+    ),
+    RgbwwSensorEntityDescription(
+        key="bytes_received",
+        name="Bytes received",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda c: c.metrics.bytes_received,
+        min_interval=timedelta(minutes=5),
+    ),
+    RgbwwSensorEntityDescription(
+        key="reconnects",
+        name="Reconnects",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda c: c.metrics.reconnects,
+    ),
+    RgbwwSensorEntityDescription(
+        key="watchdog_timeouts",
+        name="Watchdog timeouts",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda c: c.metrics.watchdog_timeouts,
+    ),
+    RgbwwSensorEntityDescription(
+        key="last_event_age",
+        name="Time since last event",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=lambda c: _rounded(c.metrics.seconds_since_last_event, 1),
+        deadband=5,
+    ),
+)
+
+
+SYNC_SENSORS: tuple[RgbwwSensorEntityDescription, ...] = (
+    RgbwwSensorEntityDescription(
+        key="syncoffset",
+        name="SyncOffet",
+        native_unit_of_measurement="sync cycles",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda c: _rounded(c.sync_stats.mean_offset, 2),
+        deadband=0.5,
+        min_interval=timedelta(minutes=1),
+    ),
+    RgbwwSensorEntityDescription(
+        key="sync_jitter",
+        name="Sync jitter",
+        native_unit_of_measurement="sync cycles",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        suggested_display_precision=1,
+        value_fn=lambda c: _rounded(c.sync_stats.jitter, 2),
+        deadband=0.5,
+        min_interval=timedelta(minutes=1),
+    ),
+    RgbwwSensorEntityDescription(
+        key="sync_max_offset",
+        name="Sync max offset",
+        native_unit_of_measurement="sync cycles",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda c: c.sync_stats.max_abs_offset,
+        deadband=1,
+        min_interval=timedelta(minutes=1),
+    ),
+    RgbwwSensorEntityDescription(
+        key="sync_interval_drift",
+        name="Sync interval drift",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        suggested_display_precision=1,
+        value_fn=lambda c: _rounded(c.sync_stats.interval_drift, 2),
+        deadband=0.5,
+        min_interval=timedelta(minutes=1),
+    ),
+)
+
+
+class ControllerMetricSensor(RgbwwEntity, SensorEntity):
+    """Diagnostic sensor for one of the controller performance counters."""
+
+    entity_description: RgbwwSensorEntityDescription
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_should_poll = False
+    # the histogram attributes are for the UI only, the state is the history
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        controller: RgbwwController,
+        config_entry: ConfigEntry,
+        description: RgbwwSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(
+            hass=hass, controller=controller, device_id=config_entry.unique_id
+        )
+        self.entity_description = description
+
+        self._attr_name = f"{config_entry.title} {description.name}"
+        self._attr_unique_id = f"{config_entry.unique_id}_{description.key}"
+        self._last_total: StateType = None
+        self._last_time: datetime | None = None
+        self._filter = _RecordingFilter.for_entry(config_entry, description)
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to the events and start the periodic update."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass, self._async_update_metrics, METRICS_UPDATE_INTERVAL
+            )
+        )
+        self._async_update_metrics(dt_util.utcnow())
+
+    @callback
+    def _async_update_metrics(self, now: datetime) -> None:
+        value = self.entity_description.value_fn(self._controller)
+
+        if self.entity_description.per_minute:
+            total, value = value, None
+            if self._last_time is not None:
+                minutes = (now - self._last_time).total_seconds() / 60
+                if minutes > 0:
+                    value = round((total - self._last_total) / minutes, 2)
+            self._last_total, self._last_time = total, now
+
+        if not self._filter.should_write(value, time.monotonic()):
+            return
+
+        self._attr_native_value = value
+        if self.entity_description.attributes_fn is not None:
+            self._attr_extra_state_attributes = self.entity_description.attributes_fn(
+                self._controller
+            )
         self.async_write_ha_state()
+
+    def on_clock_slave_status_update(self) -> None: ...
@@ -0,0 +1,573 @@
+"""Services of the fhem led controller integration.
+
+The services are registered once for the whole integration. Calls are
+dispatched through an index of the light entities of all config entries,
+which maps an entity id straight to its controller.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+import time
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.auth.permissions.const import POLICY_CONTROL
+from homeassistant.components.light import (
+    ATTR_BRIGHTNESS,
+    ATTR_COLOR_TEMP_KELVIN,
+    ATTR_TRANSITION,
+)
+from homeassistant.const import ATTR_ENTITY_ID, ENTITY_MATCH_ALL
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError, Unauthorized, UnknownUser
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
+
+from .const import (
+    ATTR_ANIM_DEFINITION_LIST,
+    ATTR_ANIM_NAME,
+    ATTR_CH_BLUE,
+    ATTR_CH_CW,
+    ATTR_CH_GREEN,
+    ATTR_CH_RED,
+    ATTR_CH_WW,
+    ATTR_HUE,
+    ATTR_QUEUE_POLICY,
+    ATTR_REQUEUE,
+    ATTR_SATURATION,
+    ATTR_STAY,
+    ATTR_TRANSITION_MODE,
+    ATTR_TRANSITION_VALUE,
+    CALLBACK_PROFILER,
+    COMMAND_BATCHER,
+    CONTROLLER_INDEX,
+    DOMAIN,
+    SCENE_SNAPSHOTS,
+)
+from .core.color_commands import (
+    ChannelsType,
+    ColorCommandHsv,
+    ColorCommandRgbww,
+    parse_color_commands,
+)
+from .core.command_batcher import CommandBatcher
+from .core.profiler import CallbackProfiler
+from .core.rgbww_controller import (
+    ControllerUnavailableError,
+    PreparedColorCommands,
+    RgbwwController,
+    prepare_channel_command,
+)
+
+SERVICE_ANIMATION_HSV = "animation_hsv"
+SERVICE_ANIMATION_CLI_HSV = "animation_cli_hsv"
+SERVICE_ANIMATION_RGBWW = "animation_rgbww"
+SERVICE_ANIMATION_CLI_RGBWW = "animation_cli_rgbww"
+SERVICE_CONTROL_CHANNEL = "control_channel"
+SERVICE_WAIT_FOR_TRANSITION = "wait_for_transition"
+SERVICE_SET_PROFILING = "set_profiling"
+SERVICE_UPDATE_CONFIG = "update_config"
+SERVICE_SNAPSHOT_SCENE = "snapshot_scene"
+SERVICE_RESTORE_SCENE = "restore_scene"
+
+ATTR_TIMEOUT = "timeout"
+ATTR_ENABLED = "enabled"
+ATTR_THRESHOLD = "threshold"
+ATTR_RESET = "reset"
+ATTR_CONFIG = "config"
+ATTR_MAX_CONCURRENCY = "max_concurrency"
+ATTR_SCENE = "scene"
+
+_SERVICE_ATTR_ANIM_CLI_COMMAND = "anim_definition_command"
+
+_COMMAND_OPTIONS = ["pause", "stop", "continue"]
+_CHANNEL_OPTIONS = ["hue", "saturation", "value", "color_temp"]
+
+_logger = logging.getLogger(__name__)
+
+
+def _get_animation_service_base_schema() -> vol.Schema:
+    return vol.Schema(
+        {
+            vol.Optional(ATTR_TRANSITION_MODE, default=None): vol.Maybe(
+                vol.In(["time", "speed"])
+            ),
+            vol.Optional(ATTR_TRANSITION_VALUE, default=None): vol.Maybe(
+                vol.All(vol.Coerce(int), vol.Range(min=0))
+            ),
+            vol.Optional(ATTR_STAY, default=None): vol.Maybe(
+                vol.All(vol.Coerce(int), vol.Range(min=0))
+            ),
+            vol.Optional(ATTR_QUEUE_POLICY, default=None): vol.Maybe(
+                vol.In(["single", "back", "front", "front_reset"])
+            ),
+            vol.Optional(ATTR_REQUEUE, default=None): vol.Maybe(cv.boolean),
+            vol.Optional(ATTR_ANIM_NAME, default=None): vol.Maybe(cv.string),
+        }
+    )
+
+
+def _get_animation_service_schema(step_fields: dict[Any, Any]) -> vol.Schema:
+    # one step of the animation, i.e. one object in the 'anim_definitions' list
+    step_schema = _get_animation_service_base_schema().extend(step_fields)
+
+    return cv.make_entity_service_schema(
+        {
+            vol.Required(ATTR_ANIM_DEFINITION_LIST): vol.All(
+                cv.ensure_list,
+                [step_schema],
+                vol.Length(min=1),
+            ),
+        }
+    )
+
+
+def _get_animation_hsv_service_schema() -> vol.Schema:
+    return _get_animation_service_schema(
+        {
+            vol.Optional(ATTR_HUE, default=None): vol.Maybe(cv.string),
+            vol.Optional(ATTR_SATURATION, default=None): vol.Maybe(cv.string),
+            vol.Optional(ATTR_BRIGHTNESS, default=None): vol.Maybe(cv.string),
+            vol.Optional(ATTR_COLOR_TEMP_KELVIN, default=None): vol.Maybe(cv.string),
+        }
+    )
+
+
+def _get_animation_rgbww_service_schema() -> vol.Schema:
+    return _get_animation_service_schema(
+        {
+            vol.Optional(ATTR_CH_RED, default=None): vol.Maybe(cv.string),
+            vol.Optional(ATTR_CH_GREEN, default=None): vol.Maybe(cv.string),
+            vol.Optional(ATTR_CH_BLUE, default=None): vol.Maybe(cv.string),
+            vol.Optional(ATTR_CH_CW, default=None): vol.Maybe(cv.string),
+            vol.Optional(ATTR_CH_WW, default=None): vol.Maybe(cv.string),
+        }
+    )
+
+
+def _get_animation_cli_service_schema() -> vol.Schema:
+    return cv.make_entity_service_schema(
+        {vol.Required(_SERVICE_ATTR_ANIM_CLI_COMMAND): cv.string}
+    )
+
+
+def _get_control_channel_service_schema() -> vol.Schema:
+    return cv.make_entity_service_schema(
+        {
+            vol.Required("command"): vol.In(_COMMAND_OPTIONS),
+            # a single channel is accepted as well
+            vol.Required("channels"): cv.ensure_list(vol.In(_CHANNEL_OPTIONS)),
+        }
+    )
+
+
+def _get_wait_for_transition_service_schema() -> vol.Schema:
+    return cv.make_entity_service_schema(
+        {
+            vol.Required(ATTR_ANIM_NAME): cv.string,
+            vol.Optional(ATTR_TIMEOUT, default=60): vol.All(
+                vol.Coerce(float), vol.Range(min=0)
+            ),
+        }
+    )
+
+
+def _get_set_profiling_service_schema() -> vol.Schema:
+    return vol.Schema(
+        {
+            vol.Required(ATTR_ENABLED): cv.boolean,
+            # milliseconds
+            vol.Optional(ATTR_THRESHOLD): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            vol.Optional(ATTR_RESET, default=False): cv.boolean,
+        }
+    )
+
+
+def _get_update_config_service_schema() -> vol.Schema:
+    return cv.make_entity_service_schema(
+        {
+            # partial config document of the controller API
+            vol.Required(ATTR_CONFIG): vol.All(dict, vol.Length(min=1)),
+            vol.Optional(ATTR_MAX_CONCURRENCY, default=8): vol.All(
+                vol.Coerce(int), vol.Range(min=1)
+            ),
+        }
+    )
+
+
+def _get_snapshot_scene_service_schema() -> vol.Schema:
+    return cv.make_entity_service_schema(
+        {
+            vol.Required(ATTR_SCENE): cv.string,
+            # seconds, the restore fades to the snapshot within this time
+            vol.Optional(ATTR_TRANSITION, default=0): vol.All(
+                vol.Coerce(float), vol.Range(min=0)
+            ),
+        }
+    )
+
+
+def _get_restore_scene_service_schema() -> vol.Schema:
+    return vol.Schema({vol.Required(ATTR_SCENE): cv.string})
+
+
+def _get_controller_index(hass: HomeAssistant) -> dict[str, RgbwwController]:
+    return hass.data[DOMAIN][CONTROLLER_INDEX]
+
+
+async def _async_permitted_entities(
+    hass: HomeAssistant,
+    call: ServiceCall,
+    entity_ids: set[str],
+    referenced: set[str],
+) -> set[str]:
+    """Return the entities of `entity_ids` the user of `call` may control.
+
+    Like the entity services of Home Assistant, an explicitly `referenced`
+    entity without permission raises Unauthorized, the others are skipped.
+    """
+    if not call.context.user_id:
+        return entity_ids
+    user = await hass.auth.async_get_user(call.context.user_id)
+    if user is None:
+        raise UnknownUser(context=call.context)
+    if user.is_admin:
+        return entity_ids
+
+    check = user.permissions.check_entity
+    for entity_id in referenced:
+        if not check(entity_id, POLICY_CONTROL):
+            raise Unauthorized(
+                context=call.context, entity_id=entity_id, permission=POLICY_CONTROL
+            )
+    return {e for e in entity_ids if check(e, POLICY_CONTROL)}
+
+
+async def _resolve_controllers(
+    hass: HomeAssistant, call: ServiceCall
+) -> dict[str, RgbwwController]:
+    """Return the controllers targeted by `call`, keyed by light entity id."""
+    index = _get_controller_index(hass)
+    if call.data.get(ATTR_ENTITY_ID) == ENTITY_MATCH_ALL:
+        entity_ids, referenced = set(index), set()
+    else:
+        selected = async_extract_referenced_entity_ids(hass, call)
+        # targets may include other entities (sensors of a device, lights of an area)
+        entity_ids = {
+            e
+            for e in selected.referenced | selected.indirectly_referenced
+            if e in index
+        }
+        referenced = selected.referenced & entity_ids
+
+    entity_ids = await _async_permitted_entities(hass, call, entity_ids, referenced)
+    return {e: index[e] for e in entity_ids}
+
+
+async def _call_controllers(
+    call: ServiceCall,
+    controllers: dict[str, RgbwwController],
+    send: Callable[[RgbwwController], Awaitable[Any]],
+) -> dict[str, dict[str, Any]]:
+    """Run `send` for all controllers concurrently and report the failures.
+
+    Returns the result per light. Failures raise unless the caller requested a
+    response, in that case they are part of the result.
+    """
+    started = time.perf_counter()
+    done: dict[str, float] = {}
+
+    async def run(entity_id: str, controller: RgbwwController) -> None:
+        await send(controller)
+        done[entity_id] = time.perf_counter() - started
+
+    results = await asyncio.gather(
+        *(run(e, c) for e, c in controllers.items()), return_exceptions=True
+    )
+
+    response: dict[str, dict[str, Any]] = {}
+    unavailable: list[str] = []
+    for (entity_id, controller), result in zip(
+        controllers.items(), results, strict=True
+    ):
+        if result is None:
+            response[entity_id] = {
+                "success": True,
+                "latency": round(done[entity_id], 4),
+            }
+            continue
+        if isinstance(result, ControllerUnavailableError):
+            _logger.error(
+                "%s failed: Device at %s is unavailable. Error: %s",
+                call.service,
+                controller.host,
+                result,
+            )
+            unavailable.append(entity_id)
+        elif isinstance(result, Exception):
+            _logger.error("%s failed: Error: %s", call.service, result)
+            if not call.return_response:
+                raise HomeAssistantError(
+                    f"Failed to run {call.service}. Error: {result}"
+                ) from result
+        else:
+            raise result
+        response[entity_id] = {"success": False, "error": str(result)}
+
+    if unavailable and not call.return_response:
+        raise HomeAssistantError(
+            f"Failed to run {call.service}: {', '.join(unavailable)} unavailable."
+        )
+    return response
+
+
+def _register_animation_service(
+    hass: HomeAssistant,
+    service: str,
+    schema: vol.Schema,
+    build: Callable[[ServiceCall], list[ColorCommandHsv] | list[ColorCommandRgbww]],
+) -> None:
+    async def on_service_animation(call: ServiceCall) -> None:
+        controllers = await _resolve_controllers(hass, call)
+        _logger.debug("%s service called for %s", service, list(controllers))
+        if not controllers:
+            return
+
+        # parsed and serialized once for all targeted controllers
+        try:
+            prepared = PreparedColorCommands.from_commands(build(call))
+        except Exception as e:
+            _logger.error("Animation failed: Error: %s", e)
+            raise HomeAssistantError(f"Failed to start animation. Error: {e}") from e
+
+        batcher: CommandBatcher = hass.data[DOMAIN][COMMAND_BATCHER]
+        await _call_controllers(
+            call, controllers, lambda c: batcher.send_prepared(c, prepared)
+        )
+
+    hass.services.async_register(DOMAIN, service, on_service_animation, schema)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+    hass.data.setdefault(DOMAIN, {}).setdefault(CONTROLLER_INDEX, {})
+    # scene name -> restore commands per light entity id, kept until restart
+    snapshots: dict[str, dict[str, PreparedColorCommands]] = {}
+    hass.data[DOMAIN][SCENE_SNAPSHOTS] = snapshots
+
+    _register_animation_service(
+        hass,
+        SERVICE_ANIMATION_HSV,
+        _get_animation_hsv_service_schema(),
+        lambda call: [
+            ColorCommandHsv.from_service(cmd)
+            for cmd in call.data[ATTR_ANIM_DEFINITION_LIST]
+        ],
+    )
+    _register_animation_service(
+        hass,
+        SERVICE_ANIMATION_CLI_HSV,
+        _get_animation_cli_service_schema(),
+        lambda call: parse_color_commands(
+            call.data[_SERVICE_ATTR_ANIM_CLI_COMMAND], ChannelsType.HSV
+        ),
+    )
+    _register_animation_service(
+        hass,
+        SERVICE_ANIMATION_RGBWW,
+        _get_animation_rgbww_service_schema(),
+        lambda call: [
+            ColorCommandRgbww.from_service(cmd)
+            for cmd in call.data[ATTR_ANIM_DEFINITION_LIST]
+        ],
+    )
+    _register_animation_service(
+        hass,
+        SERVICE_ANIMATION_CLI_RGBWW,
+        _get_animation_cli_service_schema(),
+        lambda call: parse_color_commands(
+            call.data[_SERVICE_ATTR_ANIM_CLI_COMMAND], ChannelsType.RGBWW
+        ),
+    )
+
+    async def on_service_channel(call: ServiceCall) -> ServiceResponse:
+        controllers = await _resolve_controllers(hass, call)
+        command = call.data["command"]
+        _logger.debug(
+            "Channel service called for %s. Command: %s", list(controllers), command
+        )
+
+        # validated once, the same payload goes to all controllers at the same time
+        try:
+            data = prepare_channel_command(command, call.data["channels"])
+        except ValueError as e:
+            raise HomeAssistantError(f"Invalid channel command: {e}") from e
+
+        batcher: CommandBatcher = hass.data[DOMAIN][COMMAND_BATCHER]
+        results = await _call_controllers(
+            call,
+            controllers,
+            lambda c: batcher.send_channel_command(c, command, data),
+        )
+        return {"lights": results} if call.return_response else None
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CONTROL_CHANNEL,
+        on_service_channel,
+        _get_control_channel_service_schema(),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def on_service_wait_for_transition(call: ServiceCall) -> ServiceResponse:
+        controllers = await _resolve_controllers(hass, call)
+        name = call.data[ATTR_ANIM_NAME]
+        results: dict[str, Any] = {e: {"finished": False} for e in controllers}
+
+        async def wait(entity_id: str, controller: RgbwwController) -> None:
+            requeued = await controller.wait_for_transition(name)
+            results[entity_id] = {"finished": True, "requeued": requeued}
+
+        # all waiters are plain futures resolved by the event stream
+        try:
+            async with asyncio.timeout(call.data[ATTR_TIMEOUT]):
+                await asyncio.gather(*(wait(e, c) for e, c in controllers.items()))
+        except TimeoutError:
+            if not call.return_response:
+                pending = [e for e, r in results.items() if not r["finished"]]
+                raise HomeAssistantError(
+                    f"Transition {name} did not finish in time on {', '.join(pending)}"
+                ) from None
+
+        return {"lights": results} if call.return_response else None
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_WAIT_FOR_TRANSITION,
+        on_service_wait_for_transition,
+        _get_wait_for_transition_service_schema(),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def on_service_set_profiling(call: ServiceCall) -> ServiceResponse:
+        profiler: CallbackProfiler = hass.data[DOMAIN][CALLBACK_PROFILER]
+        if call.data[ATTR_RESET]:
+            profiler.reset()
+        if ATTR_THRESHOLD in call.data:
+            profiler.threshold = call.data[ATTR_THRESHOLD] / 1000
+        profiler.enabled = call.data[ATTR_ENABLED]
+        _logger.info(
+            "Callback profiling %s (threshold %.1f ms)",
+            "enabled" if profiler.enabled else "disabled",
+            profiler.threshold * 1000,
+        )
+        return profiler.summary() if call.return_response else None
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_PROFILING,
+        on_service_set_profiling,
+        _get_set_profiling_service_schema(),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def on_service_update_config(call: ServiceCall) -> ServiceResponse:
+        controllers = await _resolve_controllers(hass, call)
+        changes = call.data[ATTR_CONFIG]
+        semaphore = asyncio.Semaphore(call.data[ATTR_MAX_CONCURRENCY])
+        # what was sent to each controller, empty if it already matched
+        sent: dict[RgbwwController, dict[str, Any]] = {}
+
+        async def send(controller: RgbwwController) -> None:
+            async with semaphore:
+                sent[controller] = await controller.update_config(changes)
+
+        results = await _call_controllers(call, controllers, send)
+        for entity_id, result in results.items():
+            if result["success"]:
+                changed = sent[controllers[entity_id]]
+                result["skipped"] = not changed
+                result["changed"] = changed
+        return {"lights": results} if call.return_response else None
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_UPDATE_CONFIG,
+        on_service_update_config,
+        _get_update_config_service_schema(),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def on_service_snapshot_scene(call: ServiceCall) -> ServiceResponse:
+        controllers = await _resolve_controllers(hass, call)
+        if not controllers:
+            raise HomeAssistantError("No lights of the integration targeted")
+        transition = int(call.data[ATTR_TRANSITION] * 1000)
+        # serialized now, so restoring only has to send them
+        snapshots[call.data[ATTR_SCENE]] = {
+            entity_id: controller.prepare_restore(transition)
+            for entity_id, controller in controllers.items()
+        }
+        return {"lights": list(controllers)} if call.return_response else None
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SNAPSHOT_SCENE,
+        on_service_snapshot_scene,
+        _get_snapshot_scene_service_schema(),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def on_service_restore_scene(call: ServiceCall) -> ServiceResponse:
+        name = call.data[ATTR_SCENE]
+        if (snapshot := snapshots.get(name)) is None:
+            raise HomeAssistantError(f"Unknown scene snapshot: {name}")
+
+        index = _get_controller_index(hass)
+        existing = snapshot.keys() & index.keys()
+        permitted = await _async_permitted_entities(hass, call, existing, existing)
+        controllers = {e: index[e] for e in snapshot if e in permitted}
+        payloads = {controllers[e]: snapshot[e] for e in controllers}
+        # all at once instead of through the command batcher, whose concurrency
+        # limit would spread the lights over time; every light is sent its
+        # payload so they all finish together
+        results = await _call_controllers(
+            call,
+            controllers,
+            lambda controller: controller.send_prepared(
+                payloads[controller], skip_unchanged=False
+            ),
+        )
+        for entity_id in snapshot.keys() - controllers.keys():
+            _logger.warning("Scene %s: %s does not exist anymore", name, entity_id)
+            results[entity_id] = {"success": False, "error": "light not found"}
+
+        latencies = [r["latency"] for r in results.values() if r["success"]]
+        spread = max(latencies) - min(latencies) if latencies else None
+        _logger.debug(
+            "Restored scene %s on %d lights, completion spread: %s s",
+            name,
+            len(latencies),
+            spread,
+        )
+        if not call.return_response:
+            return None
+        return {
+            "lights": results,
+            "spread": round(spread, 4) if spread is not None else None,
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RESTORE_SCENE,
+        on_service_restore_scene,
+        _get_restore_scene_service_schema(),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,60 @@
+"""Routing of transition_finished events to device triggers."""
+
+from collections.abc import Callable
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DOMAIN, TRANSITION_LISTENERS
+
+TransitionListener = Callable[[str, bool], None]
+
+
+class TransitionListeners:
+    """Device trigger listeners indexed by device and animation name.
+
+    A finished transition only reaches the listeners attached to its device,
+    either for its name or for all names, so dispatching does not depend on
+    the number of automations.
+    """
+
+    def __init__(self) -> None:
+        # device id -> animation name (None for any) -> listeners
+        self._index: dict[str, dict[str | None, list[TransitionListener]]] = {}
+
+    @callback
+    def async_attach(
+        self, device_id: str, name: str | None, listener: TransitionListener
+    ) -> CALLBACK_TYPE:
+        listeners = self._index.setdefault(device_id, {}).setdefault(name, [])
+        listeners.append(listener)
+
+        @callback
+        def detach() -> None:
+            listeners.remove(listener)
+            if not listeners:
+                by_name = self._index[device_id]
+                del by_name[name]
+                if not by_name:
+                    del self._index[device_id]
+
+        return detach
+
+    @callback
+    def async_dispatch(self, device_id: str, name: str, requeued: bool) -> None:
+        if (by_name := self._index.get(device_id)) is None:
+            return
+        # copies, a listener may detach itself
+        for listener in (*by_name.get(name, ()), *by_name.get(None, ())):
+            listener(name, requeued)
+
+
+@callback
+def async_get_transition_listeners(hass: HomeAssistant) -> TransitionListeners:
+    """Return the listeners of the integration, created on first use.
+
+    Device triggers can be attached before the integration has been set up,
+    e.g. by automations that are loaded first.
+    """
+    return hass.data.setdefault(DOMAIN, {}).setdefault(
+        TRANSITION_LISTENERS, TransitionListeners()
+    )
@@ -0,0 +1 @@
+"""Tests of the FHEM RGBWW Controller integration."""
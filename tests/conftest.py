@@ -0,0 +1,53 @@
+"""Fixtures driving a controller against an in-memory loopback device."""
+
+import asyncio
+from collections.abc import AsyncIterator, Callable
+import contextlib
+from typing import Any
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.fhem_rgbwwcontroller.core.rgbww_controller import (
+    RgbwwController,
+)
+from custom_components.fhem_rgbwwcontroller.core.transport import LoopbackTransport
+
+
+async def settle(condition: Callable[[], bool], timeout: float = 5) -> None:
+    """Wait until `condition` holds, e.g. until an event has been handled."""
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.001)
+
+
+@contextlib.asynccontextmanager
+async def connected(
+    hass: HomeAssistant,
+    device: LoopbackTransport,
+    host: str = "192.168.1.50",
+    **kwargs: Any,
+) -> AsyncIterator[RgbwwController]:
+    """A controller connected to `device` that has received its full state."""
+    controller = RgbwwController(hass, host, transport=device, **kwargs)
+    await controller.connect()
+    try:
+        await settle(lambda: controller.state_completed)
+        yield controller
+    finally:
+        await controller.disconnect()
+        await controller._connection_task
+
+
+@pytest.fixture
+def device() -> LoopbackTransport:
+    return LoopbackTransport()
+
+
+@pytest.fixture
+async def controller(
+    hass: HomeAssistant, device: LoopbackTransport
+) -> AsyncIterator[RgbwwController]:
+    async with connected(hass, device) as controller:
+        yield controller
@@ -0,0 +1,77 @@
+"""Tests of the circuit breaker of unreachable controllers."""
+
+import asyncio
+
+import pytest
+
+from custom_components.fhem_rgbwwcontroller.core.circuit_breaker import (
+    BreakerState,
+    CircuitBreaker,
+)
+
+
+@pytest.fixture(autouse=True)
+def fast_probes(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(CircuitBreaker, "MIN_PROBE_INTERVAL", 0.001)
+    monkeypatch.setattr(CircuitBreaker, "MAX_PROBE_INTERVAL", 0.001)
+
+
+async def _unreachable() -> bool:
+    return False
+
+
+async def test_opens_after_consecutive_failures() -> None:
+    breaker = CircuitBreaker(_unreachable, "test")
+
+    for _ in range(CircuitBreaker.FAILURE_THRESHOLD - 1):
+        breaker.record_failure()
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state is not BreakerState.CLOSED
+    assert not breaker.allow_request()
+    assert breaker.trips == 1
+    assert breaker.rejected == 1
+    breaker.stop()
+
+
+async def test_success_resets_the_failure_count() -> None:
+    breaker = CircuitBreaker(_unreachable, "test")
+
+    for _ in range(CircuitBreaker.FAILURE_THRESHOLD - 1):
+        breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state is BreakerState.CLOSED
+
+
+async def test_recovery_probe_closes_the_breaker() -> None:
+    answers = iter((False, True))
+    probes = 0
+
+    async def probe() -> bool:
+        nonlocal probes
+        probes += 1
+        return next(answers)
+
+    breaker = CircuitBreaker(probe, "test")
+    breaker.on_connection_change(False)
+    assert breaker.state is BreakerState.OPEN
+
+    async with asyncio.timeout(1):
+        while breaker.state is not BreakerState.CLOSED:
+            await asyncio.sleep(0.001)
+    assert probes == 2
+    assert breaker.opened_at is None
+    assert breaker.allow_request()
+
+
+async def test_reconnect_closes_the_breaker() -> None:
+    breaker = CircuitBreaker(_unreachable, "test")
+    breaker.on_connection_change(False)
+
+    breaker.on_connection_change(True)
+
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.allow_request()
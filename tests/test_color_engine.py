@@ -0,0 +1,70 @@
+"""Tests of the HSV+CT to RGBWW rendering of the controller firmware."""
+
+import pytest
+
+from custom_components.fhem_rgbwwcontroller.core.color_engine import (
+    ColorEngine,
+    OutputMode,
+)
+
+
+@pytest.mark.parametrize(
+    ("output_mode", "expected"),
+    [
+        # the white part (512) is split by the color temperature
+        (OutputMode.RGBWWCW, (512, 256, 0, 202, 310)),
+        (OutputMode.RGBWW, (512, 256, 0, 0, 512)),
+        (OutputMode.RGBCW, (512, 256, 0, 512, 0)),
+        # the white part is added to the color channels
+        (OutputMode.RGB, (1023, 767, 512, 0, 0)),
+    ],
+)
+def test_output_modes(
+    output_mode: OutputMode, expected: tuple[int, int, int, int, int]
+) -> None:
+    engine = ColorEngine(ww_kelvin=2700, cw_kelvin=6000, output_mode=output_mode)
+
+    assert engine.hsv_to_raw(30, 50, 100, 4000) == expected
+
+
+@pytest.mark.parametrize(
+    ("hue", "expected"),
+    [
+        # red is rendered at 10 degrees instead of 0
+        (10, (1023, 0, 0, 0, 0)),
+        # between red and yellow the hue is stretched over 50 degrees
+        (40, (1023, 614, 0, 0, 0)),
+        # between magenta and red over 70 degrees
+        (0, (1023, 0, 146, 0, 0)),
+        # the other primary colors are not moved
+        (120, (0, 1023, 0, 0, 0)),
+    ],
+)
+def test_hue_correction(hue: int, expected: tuple[int, int, int, int, int]) -> None:
+    engine = ColorEngine(hue_offsets=(10, 0, 0, 0, 0, 0))
+
+    assert engine.hsv_to_raw(hue, 100, 100, 2700) == expected
+
+
+def test_channel_brightness() -> None:
+    engine = ColorEngine(brightness=(50, 100, 100, 100, 50))
+
+    assert engine.hsv_to_raw(60, 100, 100, 2700) == (512, 1023, 0, 0, 0)
+    assert engine.hsv_to_raw(0, 0, 100, 2700) == (0, 0, 0, 0, 512)
+
+
+def test_from_config() -> None:
+    config = {
+        "color": {
+            "outputmode": 1,
+            "colortemp": {"ww": 2700, "cw": 6000},
+            "brightness": {"red": 50},
+            "hsv": {"model": 0, "red": 10},
+        }
+    }
+
+    engine = ColorEngine.from_config(config)
+
+    assert engine.output_mode is OutputMode.RGBWW
+    assert engine.hsv_to_raw(10, 50, 100, 4000) == (256, 0, 0, 0, 512)
+    assert engine.hsv_to_rgbww(10, 50, 100, 4000) == (64, 0, 0, 0, 128)
@@ -0,0 +1,79 @@
+"""Tests of the transition_finished device trigger."""
+
+from typing import Any
+
+from homeassistant.const import (
+    CONF_DEVICE_ID,
+    CONF_DOMAIN,
+    CONF_NAME,
+    CONF_PLATFORM,
+    CONF_TYPE,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from custom_components.fhem_rgbwwcontroller.const import DOMAIN
+from custom_components.fhem_rgbwwcontroller.device_trigger import async_attach_trigger
+from custom_components.fhem_rgbwwcontroller.transition_events import (
+    async_get_transition_listeners,
+)
+
+
+async def _attach(
+    hass: HomeAssistant,
+    device_id: str,
+    triggers: list[dict[str, Any]],
+    name: str | None = None,
+) -> CALLBACK_TYPE:
+    config = {
+        CONF_PLATFORM: "device",
+        CONF_DOMAIN: DOMAIN,
+        CONF_DEVICE_ID: device_id,
+        CONF_TYPE: "transition_finished",
+    }
+    if name is not None:
+        config[CONF_NAME] = name
+
+    @callback
+    def action(run_variables: dict[str, Any], context: Any = None) -> None:
+        triggers.append(run_variables["trigger"])
+
+    return await async_attach_trigger(
+        hass, config, action, {"trigger_data": {"id": "0", "idx": "0"}}
+    )
+
+
+async def test_trigger_fires_for_its_device_only(hass: HomeAssistant) -> None:
+    any_a: list[dict[str, Any]] = []
+    sunrise_a: list[dict[str, Any]] = []
+    any_b: list[dict[str, Any]] = []
+    detach = await _attach(hass, "device_a", any_a)
+    await _attach(hass, "device_a", sunrise_a, name="sunrise")
+    await _attach(hass, "device_b", any_b)
+    listeners = async_get_transition_listeners(hass)
+
+    listeners.async_dispatch("device_a", "sunrise", False)
+    listeners.async_dispatch("device_a", "sunset", True)
+    await hass.async_block_till_done()
+
+    assert [(t["name"], t["requeued"]) for t in any_a] == [
+        ("sunrise", False),
+        ("sunset", True),
+    ]
+    assert [t["name"] for t in sunrise_a] == ["sunrise"]
+    assert sunrise_a[0][CONF_DEVICE_ID] == "device_a"
+    assert any_b == []
+
+    detach()
+    listeners.async_dispatch("device_a", "sunrise", False)
+    listeners.async_dispatch("device_b", "sunrise", False)
+    await hass.async_block_till_done()
+
+    assert len(any_a) == 2
+    assert len(sunrise_a) == 2
+    assert [t[CONF_DEVICE_ID] for t in any_b] == ["device_b"]
+
+
+async def test_listeners_are_shared(hass: HomeAssistant) -> None:
+    listeners = async_get_transition_listeners(hass)
+
+    assert async_get_transition_listeners(hass) is listeners
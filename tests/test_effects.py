@@ -0,0 +1,58 @@
+"""Tests of the prepared light effects."""
+
+import json
+
+import pytest
+
+from custom_components.fhem_rgbwwcontroller.core.effects import get_effect
+
+
+def test_effect_is_prepared_once_per_brightness() -> None:
+    get_effect.cache_clear()
+
+    first = get_effect("candle", 50)
+
+    assert get_effect("candle", 50) is first
+    assert get_effect("candle", 60) is not first
+    assert get_effect.cache_info().hits == 1
+
+
+def test_looping_effect_payload() -> None:
+    effect = get_effect("breathe", 60)
+
+    assert effect.payload == {
+        "cmds": [
+            {
+                "hsv": {"v": 60},
+                "t": 2000,
+                "stay": 300,
+                "q": "single",
+                "r": True,
+                "d": "short",
+            },
+            {
+                "hsv": {"v": 6},
+                "t": 2000,
+                "stay": 300,
+                "q": "back",
+                "r": True,
+                "d": "short",
+            },
+        ]
+    }
+    assert json.loads(effect.body) == effect.payload
+    assert effect.supersedes
+
+
+def test_only_the_last_sunrise_step_is_named() -> None:
+    effect = get_effect("sunrise", 60)
+
+    steps = effect.payload["cmds"]
+    assert [step.get("name") for step in steps] == [None, None, "effect_sunrise"]
+    assert not any(step.get("r") for step in steps)
+    assert steps[-1]["hsv"] == {"h": 40, "s": 30, "v": 60, "ct": 2700}
+
+
+def test_unknown_effect() -> None:
+    with pytest.raises(ValueError):
+        get_effect("disco")
@@ -0,0 +1,12 @@
+"""Memory retained per controller, see benchmarks/memory.py."""
+
+from homeassistant.core import HomeAssistant
+
+from benchmarks.memory import MAX_BYTES_PER_CONTROLLER, measure_per_controller
+
+
+async def test_memory_per_controller(hass: HomeAssistant) -> None:
+    """Controllers with a full info/config and filled histories stay in budget."""
+    per_controller = await measure_per_controller(hass, 20)
+
+    assert per_controller <= MAX_BYTES_PER_CONTROLLER
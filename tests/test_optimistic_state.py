@@ -0,0 +1,86 @@
+"""Tests of the optimistic state of the light entities."""
+
+import asyncio
+
+import pytest
+
+from custom_components.fhem_rgbwwcontroller.core.rgbww_controller import (
+    ControllerUnavailableError,
+)
+from custom_components.fhem_rgbwwcontroller.optimistic_state import OptimisticState
+
+
+class _Light:
+    """The attributes of a light entity that are set optimistically."""
+
+    def __init__(self) -> None:
+        self._attr_is_on = False
+        self._attr_brightness = 10
+        self._attr_assumed_state = False
+        self.written: list[tuple[bool, int]] = []
+
+    def async_write_ha_state(self) -> None:
+        self.written.append((self._attr_is_on, self._attr_brightness))
+
+
+async def test_target_is_shown_while_the_command_runs() -> None:
+    light = _Light()
+    optimistic = OptimisticState(light)
+
+    async with optimistic.command(is_on=True, brightness=255):
+        assert optimistic.in_flight
+        assert light.written == [(True, 255)]
+
+    assert not optimistic.in_flight
+    assert (light._attr_is_on, light._attr_brightness) == (True, 255)
+
+
+async def test_unavailable_controller_rolls_back() -> None:
+    light = _Light()
+    optimistic = OptimisticState(light)
+
+    with pytest.raises(ControllerUnavailableError):
+        async with optimistic.command(is_on=True, brightness=255):
+            raise ControllerUnavailableError("offline")
+
+    assert (light._attr_is_on, light._attr_brightness) == (False, 10)
+    assert light._attr_assumed_state
+    assert light.written == [(True, 255), (False, 10)]
+
+    optimistic.reconcile()
+    assert not light._attr_assumed_state
+
+
+async def test_other_errors_keep_the_target() -> None:
+    light = _Light()
+    optimistic = OptimisticState(light)
+
+    with pytest.raises(ValueError):
+        async with optimistic.command(is_on=True, brightness=255):
+            raise ValueError("invalid")
+
+    assert (light._attr_is_on, light._attr_brightness) == (True, 255)
+    assert not light._attr_assumed_state
+
+
+async def test_rollback_restores_the_state_before_the_first_command() -> None:
+    light = _Light()
+    optimistic = OptimisticState(light)
+    failed = asyncio.Event()
+
+    async def first() -> None:
+        async with optimistic.command(brightness=100):
+            await failed.wait()
+
+    task = asyncio.create_task(first())
+    await asyncio.sleep(0)
+    with pytest.raises(ControllerUnavailableError):
+        async with optimistic.command(brightness=200):
+            raise ControllerUnavailableError("offline")
+
+    # the first command is still running and shows its own target
+    assert light._attr_brightness == 200
+    assert not light._attr_assumed_state
+    failed.set()
+    await task
+    assert not optimistic.in_flight
@@ -0,0 +1,361 @@
+"""Tests of the controller binding, driven through a loopback device."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import pytest
+
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.fhem_rgbwwcontroller.const import DOMAIN
+from custom_components.fhem_rgbwwcontroller.core.color_commands import (
+    ColorCommandHsv,
+    ColorCommandRgbww,
+)
+from custom_components.fhem_rgbwwcontroller.core.effects import get_effect
+from custom_components.fhem_rgbwwcontroller.core.profiler import CallbackProfiler
+from custom_components.fhem_rgbwwcontroller.core.rgbww_controller import (
+    PreparedColorCommands,
+    RgbwwController,
+    config_diff,
+)
+from custom_components.fhem_rgbwwcontroller.core.send_pipeline import SendResult
+from custom_components.fhem_rgbwwcontroller.core.transport import LoopbackTransport
+from custom_components.fhem_rgbwwcontroller.services import (
+    SERVICE_CONTROL_CHANNEL,
+    _call_controllers,
+)
+
+from .conftest import connected, settle
+
+
+def _posted(device: LoopbackTransport, endpoint: str) -> list[dict]:
+    return [p for method, e, p in device.requests if method == "POST" and e == endpoint]
+
+
+async def test_loopback_applies_absolute_values(
+    controller: RgbwwController, device: LoopbackTransport
+) -> None:
+    await controller.send_color_command(
+        ColorCommandRgbww(r="100", g="+10", b="-10", cw="0", ww="20.5")
+    )
+
+    raw = device.state["color"]["raw"]
+    assert (raw["r"], raw["g"], raw["b"], raw["cw"], raw["ww"]) == (
+        100,
+        500,
+        500,
+        0,
+        20.5,
+    )
+    assert device.state["color"]["mode"] == "raw"
+    await settle(lambda: controller.color.raw_r == 100)
+
+
+async def test_unchanged_color_is_skipped(
+    controller: RgbwwController, device: LoopbackTransport
+) -> None:
+    command = ColorCommandHsv(h="120", s="100", v="80", ct="2700")
+
+    assert await controller.send_color_command(command) is SendResult.SENT
+    await settle(lambda: controller.color.hue == 120)
+
+    assert await controller.send_color_command(command) is SendResult.SKIPPED
+    assert len(_posted(device, "color")) == 1
+    assert controller.metrics.commands_skipped == 1
+
+
+async def test_unchanged_color_is_sent_if_requested(
+    controller: RgbwwController, device: LoopbackTransport
+) -> None:
+    prepared = PreparedColorCommands.from_commands(
+        [ColorCommandHsv(h="120", s="100", v="80", ct="2700")]
+    )
+    await controller.send_prepared(prepared)
+    await settle(lambda: controller.color.hue == 120)
+
+    result = await controller.send_prepared(prepared, skip_unchanged=False)
+
+    assert result is SendResult.SENT
+    assert len(_posted(device, "color")) == 2
+    assert controller.metrics.commands_skipped == 0
+
+
+async def test_fade_to_the_shown_color_is_sent(
+    controller: RgbwwController, device: LoopbackTransport
+) -> None:
+    command = ColorCommandHsv(h="120", s="100", v="80", ct="2700")
+    await controller.send_color_command(command)
+    await settle(lambda: controller.color.hue == 120)
+
+    fade = ColorCommandHsv(
+        h="120", s="100", v="80", ct="2700", speed_or_fade_duration=1000
+    )
+
+    assert await controller.send_color_command(fade) is SendResult.SENT
+    assert len(_posted(device, "color")) == 2
+
+
+async def test_relative_color_is_never_skipped(
+    controller: RgbwwController, device: LoopbackTransport
+) -> None:
+    command = ColorCommandHsv(h="+0")
+
+    assert await controller.send_color_command(command) is SendResult.SENT
+    assert await controller.send_color_command(command) is SendResult.SENT
+    assert len(_posted(device, "color")) == 2
+
+
+async def _fade(controller: RgbwwController) -> None:
+    await controller.send_color_command(ColorCommandHsv(h="10", speed_or_fade_duration=1))
+
+
+async def _relative(controller: RgbwwController) -> None:
+    await controller.send_color_command(ColorCommandHsv(v="+0"))
+
+
+async def _effect(controller: RgbwwController) -> None:
+    await controller.send_prepared(get_effect("rainbow", 80))
+
+
+async def _stop(controller: RgbwwController) -> None:
+    await controller.send_channel_command("stop", ["hue"])
+
+
+@pytest.mark.parametrize("other", [_fade, _relative, _effect, _stop])
+async def test_other_commands_reset_the_target(
+    controller: RgbwwController,
+    device: LoopbackTransport,
+    other: Callable[[RgbwwController], Awaitable[None]],
+) -> None:
+    command = ColorCommandHsv(h="120", s="100", v="80", ct="2700")
+    await controller.send_color_command(command)
+    await settle(lambda: controller.color.hue == 120)
+
+    await other(controller)
+
+    # the controller may no longer show the color of the first command
+    assert await controller.send_color_command(command) is SendResult.SENT
+    assert controller.metrics.commands_skipped == 0
+
+
+async def test_queued_color_is_compared_with_the_last_submitted_one(
+    controller: RgbwwController,
+    device: LoopbackTransport,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    posting = asyncio.Event()
+    release = asyncio.Event()
+    post = device.post
+
+    async def blocked_post(*args):
+        posting.set()
+        await release.wait()
+        return await post(*args)
+
+    monkeypatch.setattr(device, "post", blocked_post)
+    red = ColorCommandHsv(h="0", s="100", v="80", ct="2700")
+    green = ColorCommandHsv(h="120", s="100", v="80", ct="2700")
+
+    first = asyncio.create_task(controller.send_color_command(red))
+    await posting.wait()
+    queued = asyncio.create_task(controller.send_color_command(green))
+    await settle(lambda: controller._pipeline.pending == 1)
+
+    # green is what the controller shows once the queue is sent
+    assert await controller.send_color_command(green) is SendResult.SKIPPED
+    # red is being sent right now, but green follows it
+    back_to_red = asyncio.create_task(controller.send_color_command(red))
+    await settle(lambda: queued.done())
+    release.set()
+
+    assert await first is SendResult.SENT
+    assert await queued is SendResult.SUPERSEDED
+    assert await back_to_red is SendResult.SENT
+    assert controller.metrics.commands_skipped == 1
+
+
+async def test_wait_for_transition(
+    controller: RgbwwController, device: LoopbackTransport
+) -> None:
+    first = asyncio.create_task(controller.wait_for_transition("sunrise"))
+    second = asyncio.create_task(controller.wait_for_transition("sunrise"))
+    other = asyncio.create_task(controller.wait_for_transition("sunset"))
+    await asyncio.sleep(0)
+
+    device.emit("transition_finished", {"name": "sunrise", "requeued": True})
+
+    assert await first is True
+    assert await second is True
+    assert not other.done()
+    other.cancel()
+
+
+async def test_wait_for_transition_timeout_removes_the_waiter(
+    controller: RgbwwController,
+) -> None:
+    try:
+        async with asyncio.timeout(0.01):
+            await controller.wait_for_transition("sunrise")
+    except TimeoutError:
+        pass
+
+    assert controller._transition_waiters == {}
+
+
+@pytest.mark.parametrize("return_response", [True, False])
+async def test_call_controllers_reports_each_light(
+    hass: HomeAssistant, controller: RgbwwController, return_response: bool
+) -> None:
+    offline = LoopbackTransport()
+    async with connected(hass, offline, "192.168.1.51") as unavailable:
+        offline.online = False
+        call = ServiceCall(
+            hass, DOMAIN, SERVICE_CONTROL_CHANNEL, {}, return_response=return_response
+        )
+        controllers = {"light.online": controller, "light.offline": unavailable}
+
+        async def send(c: RgbwwController) -> None:
+            await c.send_channel_command("stop", ["hue"])
+
+        if not return_response:
+            with pytest.raises(HomeAssistantError, match="light.offline unavailable"):
+                await _call_controllers(call, controllers, send)
+            return
+
+        results = await _call_controllers(call, controllers, send)
+
+    assert results["light.online"]["success"] is True
+    assert results["light.online"]["latency"] >= 0
+    assert results["light.offline"]["success"] is False
+    assert "offline" in results["light.offline"]["error"]
+
+
+class _Listener:
+    """Counts the color updates of a controller."""
+
+    def __init__(self) -> None:
+        self.colors = 0
+
+    def on_update_color(self) -> None:
+        self.colors += 1
+
+    def on_connection_update(self) -> None: ...
+    def on_transition_finished(self, name: str, requeued: bool) -> None: ...
+    def on_config_update(self) -> None: ...
+    def on_state_completed(self) -> None: ...
+    def on_clock_slave_status_update(self) -> None: ...
+    def delme_func(self) -> None: ...
+
+
+async def test_profiler_records_only_while_enabled(
+    hass: HomeAssistant, device: LoopbackTransport
+) -> None:
+    profiler = CallbackProfiler()
+    async with connected(hass, device, profiler=profiler) as controller:
+        listener = _Listener()
+        controller.register_callback(listener)
+
+        device.emit("color_event", device.state["color"])
+        await settle(lambda: listener.colors == 1)
+        assert profiler.histograms == {}
+
+        profiler.enabled = True
+        profiler.threshold = 0
+        device.emit("color_event", device.state["color"])
+        await settle(lambda: listener.colors == 2)
+
+        assert profiler.histograms["dispatch.color_event"].count == 1
+        assert profiler.histograms["_Listener.on_update_color"].count == 1
+        assert profiler.slow_calls == 2
+
+
+def test_config_diff_keeps_only_changed_keys() -> None:
+    current = {"sync": {"cmd_slave_enabled": True, "clock_slave_topic": "a"}}
+    changes = {"sync": {"cmd_slave_enabled": True, "clock_slave_topic": "b"}}
+
+    assert config_diff(current, changes) == {"sync": {"clock_slave_topic": "b"}}
+    assert config_diff(current, current) == {}
+
+
+def test_config_diff_counts_unknown_keys_as_changed() -> None:
+    changes = {"network": {"mqtt": {"enabled": False}}, "general": {"x": 1}}
+
+    assert config_diff(None, changes) == changes
+    assert config_diff({"network": {}}, changes) == changes
+
+
+async def test_update_config_sends_the_difference(
+    controller: RgbwwController, device: LoopbackTransport
+) -> None:
+    changes = {"network": {"mqtt": {"enabled": True, "server": "broker"}}}
+
+    sent = await controller.update_config(changes)
+
+    assert sent == {"network": {"mqtt": {"server": "broker"}}}
+    assert _posted(device, "config") == [sent]
+    assert device.state["config"]["network"]["mqtt"] == {
+        "enabled": True,
+        "server": "broker",
+    }
+
+    assert await controller.update_config(changes) == {}
+    assert len(_posted(device, "config")) == 1
+
+
+async def test_update_config_merges_into_the_retained_fields(
+    controller: RgbwwController, device: LoopbackTransport
+) -> None:
+    changes = {
+        "sync": {"clock_slave_topic": "home/clock"},
+        "general": {"api_password": "secret"},
+    }
+
+    await controller.update_config(changes)
+
+    config = controller.cached_config
+    assert config["sync"] == {"cmd_slave_enabled": True, "clock_slave_topic": "home/clock"}
+    # not retained, so it is sent again every time
+    assert "api_password" not in config.get("general", {})
+    assert await controller.update_config(changes) == {
+        "general": {"api_password": "secret"}
+    }
+
+
+async def test_snapshot_restore_round_trip(
+    controller: RgbwwController, device: LoopbackTransport
+) -> None:
+    await controller.send_color_command(
+        ColorCommandHsv(h="120", s="100", v="80", ct="2700")
+    )
+    await settle(lambda: controller.color.hue == 120)
+    snapshot = controller.prepare_restore(transition=0)
+
+    await controller.send_color_command(ColorCommandHsv(h="10"))
+    await settle(lambda: controller.color.hue == 10)
+    assert await controller.send_prepared(snapshot, skip_unchanged=False) is (
+        SendResult.SENT
+    )
+    await settle(lambda: controller.color.hue == 120)
+
+    # restoring is sent even if the color is already shown
+    assert await controller.send_prepared(snapshot, skip_unchanged=False) is (
+        SendResult.SENT
+    )
+    assert _posted(device, "color")[-1] == snapshot.payload
+    assert len(_posted(device, "color")) == 4
+
+
+async def test_snapshot_of_raw_color(
+    controller: RgbwwController, device: LoopbackTransport
+) -> None:
+    await controller.send_color_command(
+        ColorCommandRgbww(r=100, g=200, b=300, cw=400, ww=500)
+    )
+    await settle(lambda: controller.color.color_mode == "raw")
+
+    snapshot = controller.prepare_restore(transition=1000)
+
+    assert snapshot.payload["raw"] == {"r": 100, "g": 200, "b": 300, "cw": 400, "ww": 500}
+    assert snapshot.payload["t"] == 1000
@@ -0,0 +1,107 @@
+"""Tests of the ordered send pipeline of a controller."""
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from custom_components.fhem_rgbwwcontroller.core.send_pipeline import (
+    SendPipeline,
+    SendResult,
+)
+
+
+class _RecordingPost:
+    """Records the posted requests, each one blocks until released."""
+
+    def __init__(self) -> None:
+        self.requests: list[tuple[str, dict[str, Any], bytes | None]] = []
+        self.release = asyncio.Event()
+
+    async def __call__(
+        self, endpoint: str, payload: dict[str, Any], body: bytes | None
+    ) -> None:
+        self.requests.append((endpoint, payload, body))
+        await self.release.wait()
+
+
+def _color(h: int) -> dict[str, Any]:
+    return {"hsv": {"h": h}, "t": 0}
+
+
+async def test_single_command_is_sent_with_its_body() -> None:
+    post = _RecordingPost()
+    post.release.set()
+    pipeline = SendPipeline(post, "test")
+
+    result = await pipeline.submit("color", _color(1), [_color(1)], body=b"body")
+
+    assert result is SendResult.SENT
+    assert post.requests == [("color", _color(1), b"body")]
+    assert pipeline.pending == 0
+
+
+async def test_waiting_color_commands_are_merged() -> None:
+    post = _RecordingPost()
+    pipeline = SendPipeline(post, "test")
+
+    first = pipeline.submit("color", _color(1), [_color(1)])
+    await asyncio.sleep(0)  # the first request is in flight
+    second = pipeline.submit("color", _color(2), [_color(2)], body=b"2")
+    third = pipeline.submit("color", _color(3), [_color(3)], body=b"3")
+    post.release.set()
+
+    assert await first is SendResult.SENT
+    assert await second is SendResult.SENT
+    assert await third is SendResult.MERGED
+    assert post.requests[1] == ("color", {"cmds": [_color(2), _color(3)]}, None)
+
+
+async def test_superseding_command_drops_waiting_color_commands() -> None:
+    post = _RecordingPost()
+    pipeline = SendPipeline(post, "test")
+
+    first = pipeline.submit("color", _color(1), [_color(1)])
+    await asyncio.sleep(0)
+    dropped = pipeline.submit("color", _color(2), [_color(2)])
+    last = pipeline.submit("color", _color(3), [_color(3)], supersedes=True)
+    post.release.set()
+
+    assert await first is SendResult.SENT
+    assert await dropped is SendResult.SUPERSEDED
+    assert await last is SendResult.SENT
+    assert [payload for _, payload, _ in post.requests] == [_color(1), _color(3)]
+
+
+async def test_other_requests_are_neither_merged_nor_dropped() -> None:
+    post = _RecordingPost()
+    pipeline = SendPipeline(post, "test")
+
+    first = pipeline.submit("color", _color(1), [_color(1)])
+    await asyncio.sleep(0)
+    queued = pipeline.submit("color", _color(2), [_color(2)])
+    stop = pipeline.submit("stop", {"channels": ["h"]})
+    last = pipeline.submit("color", _color(3), [_color(3)], supersedes=True)
+    post.release.set()
+
+    await asyncio.gather(first, queued, stop, last)
+    assert [endpoint for endpoint, _, _ in post.requests] == [
+        "color",
+        "color",
+        "stop",
+        "color",
+    ]
+
+
+async def test_failure_is_raised_to_all_callers_of_the_request() -> None:
+    async def post(endpoint: str, payload: dict[str, Any], body: bytes | None):
+        await asyncio.sleep(0)
+        raise ConnectionError("offline")
+
+    pipeline = SendPipeline(post, "test")
+    first = pipeline.submit("color", _color(1), [_color(1)])
+    second = pipeline.submit("color", _color(2), [_color(2)])
+
+    for future in (first, second):
+        with pytest.raises(ConnectionError):
+            await future
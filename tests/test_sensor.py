@@ -0,0 +1,77 @@
+"""Tests of the recording filter of the sensors."""
+
+from datetime import timedelta
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.fhem_rgbwwcontroller.const import (
+    CONF_SENSOR_DEADBAND,
+    CONF_SENSOR_MIN_INTERVAL,
+    DOMAIN,
+)
+from custom_components.fhem_rgbwwcontroller.sensor import (
+    RgbwwSensorEntityDescription,
+    _RecordingFilter,
+)
+
+_DESCRIPTION = RgbwwSensorEntityDescription(
+    key="syncoffset",
+    value_fn=lambda c: None,
+    deadband=0.5,
+    min_interval=timedelta(minutes=1),
+)
+
+
+def test_first_value_is_written() -> None:
+    assert _RecordingFilter(10, 60).should_write(1, 0)
+
+
+def test_changes_within_the_deadband_are_suppressed() -> None:
+    recording = _RecordingFilter(deadband=1, min_interval=0)
+    recording.should_write(10, 0)
+
+    assert not recording.should_write(10.5, 1)
+    assert not recording.should_write(9.1, 2)
+    # compared with the last written value, not the last suppressed one
+    assert recording.should_write(11, 3)
+    assert recording.should_write(9.5, 4)
+
+
+def test_min_interval_suppresses_even_large_changes() -> None:
+    recording = _RecordingFilter(deadband=1, min_interval=60)
+    recording.should_write(10, 0)
+
+    assert not recording.should_write(100, 59)
+    assert recording.should_write(100, 60)
+    assert not recording.should_write(100, 200)
+
+
+def test_non_numeric_values_are_written_when_changed() -> None:
+    recording = _RecordingFilter(deadband=1, min_interval=0)
+    recording.should_write(None, 0)
+
+    assert not recording.should_write(None, 1)
+    assert recording.should_write(5, 2)
+    assert recording.should_write("unknown", 3)
+
+
+def test_description_defaults() -> None:
+    entry = MockConfigEntry(domain=DOMAIN)
+
+    recording = _RecordingFilter.for_entry(entry, _DESCRIPTION)
+
+    assert (recording.deadband, recording.min_interval) == (0.5, 60)
+
+
+def test_options_override_per_sensor() -> None:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        options={
+            CONF_SENSOR_DEADBAND: {"syncoffset": 2},
+            CONF_SENSOR_MIN_INTERVAL: {"syncoffset": 10, "bytes_received": 600},
+        },
+    )
+
+    recording = _RecordingFilter.for_entry(entry, _DESCRIPTION)
+
+    assert (recording.deadband, recording.min_interval) == (2, 10)
@@ -0,0 +1,45 @@
+"""Tests of the rolling clock-sync statistics."""
+
+import pytest
+
+from custom_components.fhem_rgbwwcontroller.core.sync_stats import ClockSyncStats
+
+
+def test_empty_window() -> None:
+    stats = ClockSyncStats(4)
+
+    assert len(stats) == 0
+    assert stats.mean_offset is None
+    assert stats.jitter is None
+    assert stats.max_abs_offset is None
+    assert stats.mean_interval is None
+    assert stats.interval_drift is None
+
+
+def test_statistics_of_the_window() -> None:
+    stats = ClockSyncStats(4)
+    for offset, interval in ((2, 1000), (-4, 1010), (2, 1020), (4, 1030)):
+        stats.add(offset, interval)
+
+    assert stats.mean_offset == 1
+    assert stats.jitter == 3
+    assert stats.max_abs_offset == 4
+    assert stats.mean_interval == 1015
+    assert stats.interval_drift == 10
+
+
+def test_oldest_samples_leave_the_window() -> None:
+    stats = ClockSyncStats(3)
+    for i in range(5):
+        stats.add(i, 1000 + 100 * i)
+
+    assert len(stats) == 3
+    assert stats.samples_total == 5
+    assert stats.mean_offset == 3
+    assert stats.max_abs_offset == 4
+    assert stats.interval_drift == 100
+
+
+def test_window_needs_two_samples() -> None:
+    with pytest.raises(ValueError):
+        ClockSyncStats(1)